@@ -0,0 +1,11 @@
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture
+def query_budget(db):
+    from core.query_budget import query_budget as budget
+
+    def factory(view_name, strict=True):
+        return budget(settings.QUERY_BUDGETS[view_name], strict=strict)
+    return factory
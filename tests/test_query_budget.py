@@ -0,0 +1,27 @@
+import pytest
+from django.core.cache import cache
+
+from core.query_budget import QueryBudgetExceeded, query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestQueryBudget:
+
+    def test_index_within_budget(self, client, few_posts_with_group, query_budget):
+        cache.clear()
+        with query_budget('posts:home'):
+            response = client.get('/')
+        assert response.status_code == 200
+
+    def test_group_within_budget(self, user_client, few_posts_with_group, query_budget):
+        cache.clear()
+        with query_budget('posts:groups'):
+            response = user_client.get(f'/group/{few_posts_with_group.group.slug}/')
+        assert response.status_code == 200
+
+    def test_budget_exceeded(self, few_posts_with_group):
+        from posts.models import Post
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(1):
+                [post.author.username for post in Post.objects.all()]
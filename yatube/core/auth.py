@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+
+USER_KEY = 'auth_user:{}'
+
+User = auth.get_user_model()
+
+
+def get_user(request):
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return auth.get_user(request)
+    key = USER_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+    backend_path = request.session.get(auth.BACKEND_SESSION_KEY)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if (
+        backend_path not in settings.AUTHENTICATION_BACKENDS
+        or not session_hash
+        or not constant_time_compare(
+            session_hash, user.get_session_auth_hash()
+        )
+    ):
+        return auth.get_user(request)
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(USER_KEY.format(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def user_logged_out_handler(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
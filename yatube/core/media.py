@@ -0,0 +1,147 @@
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        length = min(int(end), size)
+        if not length:
+            return False
+        return size - length, length
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end - start + 1
+
+
+def file_etag(name, stat_result):
+    if is_content_addressed(name):
+        return quote_etag(posixpath.basename(name).split('.')[0])
+    return quote_etag(f'{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}')
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def offload(name, path):
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'x-sendfile':
+        response['X-Sendfile'] = path
+    else:
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        )
+    del response['Content-Type']
+    return response
+
+
+def stream(request, path, stat_result, etag, last_modified):
+    size = stat_result.st_size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(
+        request, etag, last_modified
+    ):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, length = byte_range
+        response = FileResponse(
+            FileRange(file, start, length), status=206,
+            content_type=content_type
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{size}'
+        )
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+# Runs behind the full middleware stack: touching request.user or
+# request.session here would load the session and the cached user.
+@require_safe
+def serve(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404
+    etag = file_etag(name, stat_result)
+    last_modified = stat_result.st_mtime
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    if response is None:
+        if settings.MEDIA_SENDFILE:
+            response = offload(name, full_path)
+        else:
+            response = stream(
+                request, full_path, stat_result, etag, last_modified
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_content_addressed(name):
+        response['Cache-Control'] = (
+            f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+        )
+    return response
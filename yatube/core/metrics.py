@@ -0,0 +1,186 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERIES_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, view, value):
+        self.counts[view][bisect_left(self.buckets, value)] += 1
+        self.sums[view] += value
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for view in sorted(self.counts):
+            label = f'view="{escape(view)}"'
+            total = 0
+            for bound, count in zip(
+                (*self.buckets, '+Inf'), self.counts[view]
+            ):
+                total += count
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="{bound}"}} {total}'
+                )
+            lines.append(f'{self.name}_sum{{{label}}} {self.sums[view]}')
+            lines.append(f'{self.name}_count{{{label}}} {total}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.values = defaultdict(int)
+
+    def inc(self, view, amount=1):
+        self.values[view] += amount
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} counter',
+        ]
+        for view in sorted(self.values):
+            lines.append(
+                f'{self.name}{{view="{escape(view)}"}} {self.values[view]}'
+            )
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.duration = Histogram(
+            'yatube_request_duration_seconds',
+            'Время обработки запроса.', SECONDS_BUCKETS
+        )
+        self.queries = Histogram(
+            'yatube_db_queries', 'Число SQL-запросов за запрос.',
+            QUERIES_BUCKETS
+        )
+        self.db_time = Histogram(
+            'yatube_db_duration_seconds',
+            'Суммарное время SQL-запросов за запрос.', SECONDS_BUCKETS
+        )
+        self.template_time = Histogram(
+            'yatube_template_render_seconds',
+            'Время рендеринга шаблонов за запрос.', SECONDS_BUCKETS
+        )
+        self.cache_hits = Counter(
+            'yatube_cache_hits_total', 'Попадания в кэш фрагментов.'
+        )
+        self.cache_misses = Counter(
+            'yatube_cache_misses_total', 'Промахи кэша фрагментов.'
+        )
+
+    def observe(self, view, state, duration):
+        with self.lock:
+            self.duration.observe(view, duration)
+            self.queries.observe(view, state.queries)
+            self.db_time.observe(view, state.db_seconds)
+            self.template_time.observe(view, state.template_seconds)
+            self.cache_hits.inc(view, state.cache_hits)
+            self.cache_misses.inc(view, state.cache_misses)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for metric in (
+                self.duration, self.queries, self.db_time,
+                self.template_time, self.cache_hits, self.cache_misses,
+            ):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+def start():
+    return _current.set(RequestMetrics())
+
+
+def finish(token):
+    state = _current.get()
+    _current.reset(token)
+    return state
+
+
+def query_wrapper(execute, sql, params, many, context):
+    state = _current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        state.queries += 1
+        state.db_seconds += time.perf_counter() - started
+
+
+def record_cache(hits=0, misses=0):
+    state = _current.get()
+    if state is not None:
+        state.cache_hits += hits
+        state.cache_misses += misses
+
+
+def instrument_templates():
+    if getattr(Template.render, 'instrumented', False):
+        return
+    original_render = Template.render
+
+    def render(self, context):
+        state = _current.get()
+        if state is None:
+            return original_render(self, context)
+        state.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            state.template_depth -= 1
+            if not state.template_depth:
+                state.template_seconds += time.perf_counter() - started
+
+    render.instrumented = True
+    Template.render = render
@@ -0,0 +1,74 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from . import auth, metrics, routers
+from .query_budget import query_budget
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        token = metrics.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.query_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            state = metrics.finish(token)
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        metrics.registry.observe(
+            view_name or 'unresolved', state, time.perf_counter() - started
+        )
+        return response
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            request.query_budget_stack = stack
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        limit = settings.QUERY_BUDGETS.get(request.resolver_match.view_name)
+        if limit is not None:
+            request.query_budget_stack.enter_context(
+                query_budget(limit, strict=settings.QUERY_BUDGET_STRICT)
+            )
+
+
+class ReplicaPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = routers.finish(token)
+        if state.wrote and request.user.is_authenticated:
+            routers.pin(request.user.pk)
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
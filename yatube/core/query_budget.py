@@ -0,0 +1,79 @@
+import logging
+import sys
+import traceback
+from contextlib import ContextDecorator, ExitStack
+
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def template_lines(frame):
+    lines = []
+    while frame is not None:
+        if frame.f_code is Node.render_annotated.__code__:
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                name = origin.template_name or origin.name
+                lines.append(f'{name}:{token.lineno}: {token.contents}')
+        frame = frame.f_back
+    return lines[::-1]
+
+
+class query_budget(ContextDecorator):
+    def __init__(self, limit, strict=True, using=None):
+        self.limit = limit
+        self.strict = strict
+        self.using = using
+        self.queries = []
+        self.overruns = []
+
+    def __enter__(self):
+        self.queries = []
+        self.overruns = []
+        self.stack = ExitStack()
+        aliases = [self.using] if self.using else connections
+        for alias in aliases:
+            self.stack.enter_context(
+                connections[alias].execute_wrapper(self.wrapper)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+        if self.overruns and not self.strict:
+            logger.warning('\n\n'.join(self.overruns))
+        return False
+
+    def wrapper(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        if len(self.queries) > self.limit:
+            self.overrun(sql)
+        return execute(sql, params, many, context)
+
+    def overrun(self, sql):
+        frame = sys._getframe(2)
+        report = [
+            f'Превышен бюджет запросов: запрос №{len(self.queries)} '
+            f'при лимите {self.limit}.',
+            f'SQL: {sql}',
+        ]
+        lines = template_lines(frame)
+        if lines:
+            report.append('Шаблоны:')
+            report.extend(f'  {line}' for line in lines)
+        report.append('Стек:')
+        report.extend(
+            line.rstrip() for line in traceback.format_stack(frame)
+        )
+        message = '\n'.join(report)
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+        self.overruns.append(message)
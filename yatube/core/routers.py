@@ -0,0 +1,77 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import cached_property
+
+PIN_KEY = 'db_pin:{}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_current = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    def __init__(self, request):
+        self.request = request
+        self.replica = None
+        self.wrote = False
+
+    @cached_property
+    def pinned(self):
+        if self.request.method not in SAFE_METHODS:
+            return True
+        user = getattr(self.request, 'user', None)
+        return bool(
+            user is not None and user.is_authenticated
+            and cache.get(PIN_KEY.format(user.pk))
+        )
+
+
+def start(request):
+    return _current.set(ReplicaState(request))
+
+
+def finish(token):
+    state = _current.get()
+    _current.reset(token)
+    return state
+
+
+def pin(user_id):
+    cache.set(PIN_KEY.format(user_id), True, settings.DATABASE_PIN_SECONDS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or not settings.DATABASE_REPLICAS:
+            return None
+        if (
+            model._meta.app_label not in settings.DATABASE_REPLICA_APPS
+            or state.wrote
+            or state.pinned
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = random.choice(settings.DATABASE_REPLICAS)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASHED_NAME = re.compile(
+    r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{32,}(\.[0-9a-z]+)?$'
+)
+
+
+def is_content_addressed(name):
+    return bool(HASHED_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, *args, shard_depth=2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shard_depth = shard_depth
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        shards = [
+            digest[i * 2:i * 2 + 2] for i in range(self.shard_depth)
+        ]
+        return posixpath.join(directory, *shards, digest + extension)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if not self.exists(name):
+            partial = f'{name}.{uuid.uuid4().hex}.part'
+            partial = super()._save(partial, content)
+            os.replace(self.path(partial), self.path(name))
+        return name
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from .metrics import registry
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +15,14 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, exception):
     return render(request, 'core/csrf_failure.html', status=403)
+
+
+def metrics(request):
+    if (
+        not settings.METRICS_ENABLED
+        or request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS
+    ):
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from .conditional import (
+    feed_condition, follow_state, group_state, index_state, post_state,
+    profile_state
+)
+from .models import Group, Post, User
+from .utils import CursorPaginator
+from .views import FOLLOW_ORDERING, comments_page, follow_entries
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'comments_count', 'thumbnail_url',
+    'thumbnail_width', 'thumbnail_height', 'image_srcset',
+    'image_placeholder', 'author__username',
+    'author__first_name', 'author__last_name', 'group__slug',
+)
+
+
+def serialize_post(post):
+    image = None
+    if post.thumbnail_url:
+        image = {
+            'url': post.thumbnail_url,
+            'width': post.thumbnail_width,
+            'height': post.thumbnail_height,
+            'srcset': post.image_srcset,
+            'placeholder': post.image_placeholder,
+        }
+    return {
+        'id': post.id,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'author_name': post.author.get_full_name(),
+        'group': post.group.slug if post.group_id else None,
+        'image': image,
+        'comments_count': post.comments_count,
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def page_data(request, page, serialize):
+    links = {}
+    for name, cursor in (
+        ('previous', page.previous_cursor), ('next', page.next_cursor)
+    ):
+        links[name] = f'{request.path}?cursor={cursor}' if cursor else None
+    return {
+        'results': [serialize(obj) for obj in page],
+        'previous': links['previous'],
+        'next': links['next'],
+    }
+
+
+def posts_response(request, posts, **extra):
+    page = CursorPaginator(
+        posts.for_feed().only(*POST_FIELDS), settings.PAGE_SIZE
+    ).get_page(request.GET.get('cursor'))
+    return JsonResponse(
+        dict(extra, **page_data(request, page, serialize_post)),
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def error(status, detail):
+    return JsonResponse(
+        {'detail': detail}, status=status,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+@require_safe
+@feed_condition(index_state)
+def index(request):
+    return posts_response(request, Post.objects.all())
+
+
+@require_safe
+@feed_condition(group_state)
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    if group is None:
+        return error(404, 'Группа не найдена')
+    return posts_response(
+        request, group.posts.all(),
+        group={'slug': group.slug, 'title': group.title}
+    )
+
+
+@require_safe
+@feed_condition(profile_state)
+def profile(request, username):
+    author = User.objects.select_related('stats').filter(
+        username=username
+    ).first()
+    if author is None:
+        return error(404, 'Пользователь не найден')
+    return posts_response(
+        request, author.posts.all(),
+        author={
+            'username': author.username,
+            'name': author.get_full_name(),
+            'posts_count': author.stats.posts_count,
+            'following': request.feed_state[1][0],
+        }
+    )
+
+
+@require_safe
+@feed_condition(follow_state)
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error(401, 'Требуется авторизация')
+    page = CursorPaginator(
+        follow_entries(request.user), settings.PAGE_SIZE, FOLLOW_ORDERING
+    ).get_page(request.GET.get('cursor'))
+    return JsonResponse(
+        page_data(request, page, lambda entry: serialize_post(entry.post)),
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+@require_safe
+@feed_condition(post_state)
+def post_detail(request, post_id):
+    post = Post.objects.for_feed().only(*POST_FIELDS).filter(
+        id=post_id
+    ).first()
+    if post is None:
+        return error(404, 'Пост не найден')
+    return JsonResponse(
+        dict(
+            serialize_post(post),
+            comments=page_data(
+                request,
+                comments_page(post.id, request.GET.get('cursor')),
+                serialize_comment
+            )
+        ),
+        json_dumps_params={'ensure_ascii': False}
+    )
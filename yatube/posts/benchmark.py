@@ -0,0 +1,233 @@
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+
+from . import counters, feed, search
+from .models import Comment, Follow, Group, Post, User
+
+SIZES = {
+    'small': {'users': 20, 'posts': 200, 'follows': 100, 'comments': 400},
+    'medium': {
+        'users': 200, 'posts': 5000, 'follows': 2000, 'comments': 10000
+    },
+    'large': {
+        'users': 1000, 'posts': 50000, 'follows': 20000, 'comments': 100000
+    },
+}
+GROUPS = 10
+BATCH_SIZE = 1000
+BASELINE_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'mmap_size': 0,
+    'cache_size': -2000,
+}
+
+
+def parse_size(value):
+    if value in SIZES:
+        return value, dict(SIZES[value])
+    size = dict(SIZES['small'])
+    for item in value.split(','):
+        key, _, number = item.partition('=')
+        if key not in size or not number.isdigit():
+            raise ValueError(f'Неизвестный размер набора данных: {value}')
+        size[key] = int(number)
+    return value, size
+
+
+def clear():
+    for model in (Comment, Follow, Post, Group, User):
+        model.objects.all().delete()
+
+
+def seed(size, seed_value=0):
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed_value)
+    rnd = random.Random(seed_value)
+    password = make_password(None)
+    User.objects.bulk_create(
+        (
+            User(username=f'bench_{i}', first_name=fake.first_name(),
+                 last_name=fake.last_name(), password=password)
+            for i in range(size['users'])
+        ),
+        batch_size=BATCH_SIZE
+    )
+    Group.objects.bulk_create(
+        Group(title=fake.sentence(nb_words=3), slug=f'bench-{i}',
+              description=fake.text(max_nb_chars=200))
+        for i in range(GROUPS)
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+    group_ids = list(Group.objects.values_list('id', flat=True)) + [None]
+    Post.objects.bulk_create(
+        (
+            Post(text=fake.text(max_nb_chars=400),
+                 author_id=rnd.choice(user_ids),
+                 group_id=rnd.choice(group_ids))
+            for _ in range(size['posts'])
+        ),
+        batch_size=BATCH_SIZE
+    )
+    pairs = set()
+    while len(pairs) < min(
+        size['follows'], len(user_ids) * (len(user_ids) - 1)
+    ):
+        user_id, author_id = rnd.sample(user_ids, 2)
+        pairs.add((user_id, author_id))
+    Follow.objects.bulk_create(
+        (Follow(user_id=user_id, author_id=author_id)
+         for user_id, author_id in pairs),
+        batch_size=BATCH_SIZE
+    )
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(post_id=rnd.choice(post_ids),
+                    author_id=rnd.choice(user_ids),
+                    text=fake.sentence())
+            for _ in range(size['comments'] if post_ids else 0)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    feed.rebuild()
+    counters.recount()
+    search.get_backend().rebuild()
+
+
+def _busiest(queryset, field):
+    return (
+        queryset.exclude(**{f'{field}__isnull': True})
+        .values(field).annotate(total=Count('pk'))
+        .order_by('-total').values_list(field, flat=True).first()
+    )
+
+
+def targets():
+    group_id = _busiest(Post.objects.all(), 'group')
+    author_id = _busiest(Post.objects.all(), 'author')
+    follower_id = _busiest(Follow.objects.all(), 'user')
+    post_id = _busiest(Comment.objects.all(), 'post')
+    group = Group.objects.filter(pk=group_id).first()
+    author = User.objects.filter(pk=author_id).first()
+    urls = {'index': reverse('posts:home')}
+    if group is not None:
+        urls['group_posts'] = reverse('posts:groups', args=[group.slug])
+    if author is not None:
+        urls['profile'] = reverse('posts:profile', args=[author.username])
+    if post_id is not None:
+        urls['post_detail'] = reverse('posts:post_detail', args=[post_id])
+    if follower_id is not None:
+        urls['follow_index'] = reverse('posts:follow_index')
+    return urls, User.objects.filter(pk=follower_id).first()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_view(client, url, requests, cold=False):
+    timings = []
+    queries = []
+    for _ in range(requests):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} вернул {response.status_code}')
+        queries.append(len(captured))
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    client.get(url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'queries': int(statistics.median(queries)),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+@override_settings(DATABASE_REPLICAS=[])
+def measure(requests, cold=False):
+    urls, follower = targets()
+    client = Client()
+    if follower is not None:
+        client.force_login(follower)
+    cache.clear()
+    return {
+        view: measure_view(client, url, requests, cold)
+        for view, url in urls.items()
+    }
+
+
+def requests_per_second(url, requests, conn_max_age, pragmas):
+    client = Client()
+    max_age = connection.settings_dict['CONN_MAX_AGE']
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+    try:
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            connection.close()
+            client.get(url)
+            close_old_connections()
+            started = time.perf_counter()
+            for _ in range(requests):
+                client.get(url)
+                close_old_connections()
+            elapsed = time.perf_counter() - started
+    finally:
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+    return round(requests / elapsed, 1)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+def throughput(requests):
+    url = reverse('posts:home')
+    return {
+        'before': requests_per_second(url, requests, 0, BASELINE_PRAGMAS),
+        'after': requests_per_second(
+            url, requests, connection.settings_dict['CONN_MAX_AGE'],
+            settings.SQLITE_PRAGMAS
+        ),
+    }
+
+
+def compare(baseline, results, tolerance):
+    regressions = []
+    for size, views in baseline.get('results', {}).items():
+        for view, expected in views.items():
+            actual = results.get(size, {}).get(view)
+            if actual is None:
+                continue
+            if actual['queries'] > expected['queries']:
+                regressions.append(
+                    f'{size}/{view}: запросов {actual["queries"]} '
+                    f'вместо {expected["queries"]}'
+                )
+            limit = expected['p95_ms'] * (1 + tolerance)
+            if actual['p95_ms'] > limit:
+                regressions.append(
+                    f'{size}/{view}: p95 {actual["p95_ms"]} мс '
+                    f'при допустимых {limit:.3f} мс'
+                )
+    return regressions
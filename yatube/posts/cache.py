@@ -0,0 +1,84 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.metrics import record_cache
+
+VERSION_KEY = 'feed_version:{}'
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def get_versions(*feeds):
+    keys = [VERSION_KEY.format(feed) for feed in feeds]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_version(), None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def invalidate(*feeds):
+    for feed in set(feeds):
+        key = VERSION_KEY.format(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _new_version(), None)
+
+
+def invalidate_on_commit(*feeds):
+    invalidate(*feeds)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: invalidate(*feeds))
+
+
+def fragment_key(feeds, *parts):
+    versions = get_versions(*feeds)
+    raw = ':'.join(str(part) for part in (*feeds, *versions, *parts))
+    return 'feed_fragment:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_or_build(key, build, timeout=None):
+    value = cache.get(key)
+    if value is not None:
+        record_cache(hits=1)
+        return value
+    record_cache(misses=1)
+    lock_key = key + ':lock'
+    if cache.add(lock_key, 1, settings.FEED_CACHE_LOCK_TIMEOUT):
+        try:
+            value = build()
+            cache.set(key, value, timeout or settings.FEED_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value
+    deadline = time.monotonic() + settings.FEED_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.FEED_CACHE_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
+
+
+def card_key(post, author_hidden, group_hidden):
+    group = post.group
+    raw = ':'.join(str(part) for part in (
+        post.id,
+        post.updated.timestamp(),
+        post.author.username,
+        post.author.get_full_name(),
+        group.slug if group else '',
+        group.title if group else '',
+        author_hidden,
+        group_hidden,
+    ))
+    return 'post_card:' + hashlib.md5(raw.encode()).hexdigest()
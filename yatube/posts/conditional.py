@@ -0,0 +1,68 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.views.decorators.http import condition
+
+from .cache import get_versions
+from .models import Follow, Group, Post, User
+
+
+def index_state(request):
+    return ['index'], ()
+
+
+def group_state(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return [f'group:{group_id}'], ()
+
+
+def profile_state(request, username):
+    authors = User.objects.filter(username=username)
+    if request.user.is_authenticated:
+        authors = authors.annotate(is_following=Exists(Follow.objects.filter(
+            user=request.user, author=OuterRef('pk')
+        )))
+    else:
+        authors = authors.annotate(is_following=Value(False, BooleanField()))
+    row = authors.values_list('id', 'is_following').first()
+    if row is None:
+        return None
+    return [f'profile:{row[0]}'], (row[1],)
+
+
+def follow_state(request):
+    if not request.user.is_authenticated:
+        return None
+    return [f'follow:{request.user.pk}'], ()
+
+
+def post_state(request, post_id):
+    author_id = Post.objects.filter(id=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return [f'post:{post_id}', f'profile:{author_id}'], ()
+
+
+def feed_condition(resolve):
+    def etag(request, *args, **kwargs):
+        if not hasattr(request, 'feed_state'):
+            request.feed_state = resolve(request, *args, **kwargs)
+        if request.feed_state is None:
+            return None
+        feeds, extra = request.feed_state
+        user_id = request.user.pk if request.user.is_authenticated else ''
+        csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+        raw = ':'.join(str(part) for part in (
+            request.path, request.GET.urlencode(), user_id, csrf_cookie,
+            *feeds, *get_versions(*feeds), *extra,
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    return condition(etag_func=etag)
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def _shift(queryset, delta, *fields):
+    queryset.update(**{field: F(field) + delta for field in fields})
+
+
+def _shift_user(user_id, delta, field):
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    if not updated and delta > 0:
+        recount_users([user_id])
+
+
+def post_created(post):
+    with transaction.atomic():
+        _shift_user(post.author_id, 1, 'posts_count')
+        if post.group_id:
+            _shift(Group.objects.filter(pk=post.group_id), 1, 'posts_count')
+
+
+def post_deleted(post):
+    with transaction.atomic():
+        _shift_user(post.author_id, -1, 'posts_count')
+        if post.group_id:
+            _shift(Group.objects.filter(pk=post.group_id), -1, 'posts_count')
+
+
+def post_moved(old_group_id, new_group_id):
+    with transaction.atomic():
+        if old_group_id:
+            _shift(Group.objects.filter(pk=old_group_id), -1, 'posts_count')
+        if new_group_id:
+            _shift(Group.objects.filter(pk=new_group_id), 1, 'posts_count')
+
+
+def comment_changed(comment, delta):
+    _shift(Post.objects.filter(pk=comment.post_id), delta, 'comments_count')
+
+
+def follow_changed(follow, delta):
+    with transaction.atomic():
+        _shift_user(follow.user_id, delta, 'following_count')
+        _shift_user(follow.author_id, delta, 'followers_count')
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def recount_users(user_ids=None):
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=pk) for pk in users.values_list('pk', flat=True)),
+        ignore_conflicts=True
+    )
+    stats = UserStats.objects.filter(user__in=users)
+    return stats.update(
+        posts_count=_count(Post.objects.all(), 'author'),
+        followers_count=_count(Follow.objects.all(), 'author'),
+        following_count=_count(Follow.objects.all(), 'user'),
+    )
+
+
+def recount_groups(group_ids=None):
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    return groups.update(posts_count=_count(Post.objects.all(), 'group'))
+
+
+def recount_posts(post_ids=None):
+    posts = Post.objects.all()
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    return posts.update(
+        comments_count=_count(Comment.objects.all(), 'post')
+    )
+
+
+def recount():
+    with transaction.atomic():
+        return {
+            'groups': recount_groups(),
+            'posts': recount_posts(),
+            'users': recount_users(),
+        }
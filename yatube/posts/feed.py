@@ -0,0 +1,90 @@
+from django.conf import settings
+
+from .models import FeedEntry, Follow, Post
+
+
+def _entries(user_id, posts):
+    return (
+        FeedEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date
+        )
+        for post_id, author_id, pub_date in posts
+    )
+
+
+def _bulk_insert(entries):
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def follower_feeds(author_id):
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+    return [f'follow:{user_id}' for user_id in followers.iterator()]
+
+
+def fan_out(post):
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_insert(
+        FeedEntry(
+            user_id=user_id,
+            post_id=post.id,
+            author_id=post.author_id,
+            pub_date=post.pub_date
+        )
+        for user_id in followers.iterator()
+    )
+
+
+def fan_out_posts(post_ids):
+    posts = {}
+    for post_id, author_id, pub_date in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list('id', 'author_id', 'pub_date'):
+        posts.setdefault(author_id, []).append((post_id, author_id, pub_date))
+    followers = Follow.objects.filter(author_id__in=posts).values_list(
+        'user_id', 'author_id'
+    )
+    user_ids = set()
+    entries = []
+    for user_id, author_id in followers.iterator():
+        user_ids.add(user_id)
+        entries.extend(_entries(user_id, posts[author_id]))
+    _bulk_insert(entries)
+    return user_ids
+
+
+def add_author(user_id, author_id):
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'author_id', 'pub_date'
+    )
+    _bulk_insert(_entries(user_id, posts.iterator()))
+
+
+def remove_author(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    follows = Follow.objects.all()
+    if user_ids is not None:
+        follows = follows.filter(user_id__in=user_ids)
+        FeedEntry.objects.filter(user_id__in=user_ids).delete()
+    else:
+        FeedEntry.objects.all().delete()
+    total = 0
+    for user_id, author_id in follows.values_list(
+        'user_id', 'author_id'
+    ).iterator():
+        add_author(user_id, author_id)
+        total += 1
+    return total
@@ -0,0 +1,64 @@
+from django.db import IntegrityError, transaction
+
+from . import counters, feed
+from .cache import invalidate_on_commit
+from .models import Follow
+
+ORDERING = ('-id',)
+
+
+def follow(user, author):
+    if user.pk == author.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    return True
+
+
+def follow_many(user, author_ids):
+    author_ids = set(author_ids) - {user.pk}
+    new_ids = author_ids - following_ids(user, author_ids)
+    if not new_ids:
+        return set()
+    with transaction.atomic():
+        Follow.objects.bulk_create(
+            (Follow(user=user, author_id=pk) for pk in new_ids),
+            ignore_conflicts=True
+        )
+        for author_id in new_ids:
+            feed.add_author(user.pk, author_id)
+        counters.recount_users([user.pk, *new_ids])
+        invalidate_on_commit(
+            f'follow:{user.pk}',
+            f'profile:{user.pk}',
+            *(f'profile:{author_id}' for author_id in new_ids)
+        )
+    return new_ids
+
+
+def unfollow(user, author):
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    return bool(deleted)
+
+
+def following_ids(user, author_ids):
+    if not user.is_authenticated:
+        return set()
+    return set(Follow.objects.filter(
+        user=user, author_id__in=author_ids
+    ).values_list('author_id', flat=True))
+
+
+def is_following(user, author):
+    return author.pk in following_ids(user, [author.pk])
+
+
+def followers(author):
+    return Follow.objects.filter(author=author).select_related('user')
+
+
+def following(user):
+    return Follow.objects.filter(user=user).select_related('author')
@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from . import images
 from .models import Post, Comment
 
 
@@ -18,6 +20,19 @@ class PostForm(forms.ModelForm):
             'image': 'Добавьте картинку к посту'
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return images.process(image)
+        return image
+
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            image = self.cleaned_data['image']
+            self.instance.image_width = image.width if image else None
+            self.instance.image_height = image.height if image else None
+        return super().save(commit)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,82 @@
+import base64
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.images import ImageFile
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'JPEG': ('.jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'WEBP': ('.webp', {'quality': 85, 'method': 4}),
+}
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def _open(upload):
+    upload.seek(0)
+    try:
+        image = Image.open(upload)
+        image.verify()
+        upload.seek(0)
+        image = Image.open(upload)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValidationError(
+            'Загрузите корректное изображение.', code='invalid_image'
+        )
+    width, height = image.size
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Изображение слишком большое: %(width)s×%(height)s.',
+            code='image_too_large',
+            params={'width': width, 'height': height},
+        )
+    return image
+
+
+def process(upload):
+    if upload.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл больше %(limit)s МБ.',
+            code='file_too_large',
+            params={'limit': settings.POST_IMAGE_MAX_UPLOAD_SIZE >> 20},
+        )
+    image = _open(upload)
+    max_size = (settings.POST_IMAGE_MAX_SIDE, settings.POST_IMAGE_MAX_SIDE)
+    image.draft('RGB', max_size)
+    image = ImageOps.exif_transpose(image)
+    if _has_alpha(image):
+        image_format = settings.POST_IMAGE_ALPHA_FORMAT
+        image = image.convert('RGBA')
+    else:
+        image_format = settings.POST_IMAGE_FORMAT
+        image = image.convert('RGB')
+    image.thumbnail(max_size, Image.LANCZOS)
+    extension, options = FORMATS[image_format]
+    output = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    image.save(output, image_format, **options)
+    output.seek(0)
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    processed = ImageFile(output, name=stem + extension)
+    processed._dimensions_cache = image.size
+    return processed
+
+
+def placeholder(field_file, size):
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image.draft('RGB', (size[0] * 8, size[1] * 8))
+        image = ImageOps.fit(image.convert('RGB'), size, Image.BILINEAR)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=40)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/jpeg;base64,{data}'
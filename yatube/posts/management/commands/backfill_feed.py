@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import feed
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Заново заполняет ленты подписок по таблице Follow'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames',
+            nargs='*',
+            help='Пользователи, чьи ленты нужно пересобрать (по умолчанию все)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('id', flat=True))
+        with transaction.atomic():
+            total = feed.rebuild(user_ids)
+        self.stdout.write(f'Пересобрано подписок: {total}')
@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку, число запросов и пиковую память страниц '
+        'постов на синтетических наборах данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            action='append',
+            dest='sizes',
+            help=(
+                'Набор данных: small, medium, large или '
+                'users=N,posts=N,follows=N,comments=N (можно несколько)'
+            )
+        )
+        parser.add_argument(
+            '--requests', type=int, default=30,
+            help='Число запросов к каждой странице'
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом'
+        )
+        parser.add_argument(
+            '--throughput', type=int, default=200,
+            help=(
+                'Число запросов к главной для замера запросов в секунду '
+                'до и после настройки соединений (0 — не замерять)'
+            )
+        )
+        parser.add_argument(
+            '--output', help='Файл для сохранения результатов в JSON'
+        )
+        parser.add_argument(
+            '--compare', help='JSON с эталонными результатами'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост p95 относительно эталона'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [
+                benchmark.parse_size(value)
+                for value in options['sizes'] or ['small']
+            ]
+        except ValueError as error:
+            raise CommandError(error)
+        old_name = connection.settings_dict['NAME']
+        directory = tempfile.mkdtemp()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'benchmark.sqlite3'
+        )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = {}
+            throughput = {}
+            for name, size in sizes:
+                benchmark.clear()
+                benchmark.seed(size)
+                results[name] = benchmark.measure(
+                    options['requests'], options['cold']
+                )
+                self.report(name, size, results[name])
+                if options['throughput']:
+                    throughput[name] = benchmark.throughput(
+                        options['throughput']
+                    )
+                    self.stdout.write(
+                        f'  index: {throughput[name]["before"]} → '
+                        f'{throughput[name]["after"]} запросов в секунду'
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(directory, ignore_errors=True)
+        data = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'requests': options['requests'],
+                'cold': options['cold'],
+                'sizes': dict(sizes),
+            },
+            'results': results,
+            'throughput': throughput,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(data, output, ensure_ascii=False, indent=2)
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = benchmark.compare(
+                baseline, results, options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Обнаружены регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write('Регрессий не обнаружено')
+
+    def report(self, name, size, views):
+        self.stdout.write(f'{name}: {size}')
+        for view, stats in views.items():
+            self.stdout.write(
+                f'  {view:<13} p50 {stats["p50_ms"]:>9.3f} мс  '
+                f'p95 {stats["p95_ms"]:>9.3f} мс  '
+                f'запросов {stats["queries"]:>3}  '
+                f'память {stats["peak_kb"]:>9.1f} КБ'
+            )
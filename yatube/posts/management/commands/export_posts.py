@@ -0,0 +1,55 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в NDJSON или CSV'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Файл для выгрузки (по умолчанию стандартный вывод)'
+        )
+        parser.add_argument(
+            '--format', choices=sorted(transfer.WRITERS),
+            help='Формат выгрузки (по умолчанию по расширению файла)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=transfer.BATCH_SIZE,
+            help='Сколько строк читать из базы за раз'
+        )
+
+    def handle(self, *args, **options):
+        path = options['output']
+        file_format = options['format'] or transfer.guess_format(path)
+        if path == '-':
+            self.export(sys.stdout, file_format, options['chunk_size'])
+            return
+        with open(path, 'w', encoding='utf-8', newline='') as stream:
+            self.export(stream, file_format, options['chunk_size'])
+
+    def export(self, stream, file_format, chunk_size):
+        writer = transfer.WRITERS[file_format](stream)
+        started = time.monotonic()
+        total = 0
+        for total, record in enumerate(
+            transfer.export_records(chunk_size), 1
+        ):
+            writer.write(record)
+            if total % chunk_size == 0:
+                self.report(total, started)
+        self.report(total, started)
+
+    def report(self, total, started):
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено записей: {total} '
+            f'({total / max(elapsed, 1e-6):.0f} в секунду)'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создает недостающие миниатюры картинок постов'
+
+    def handle(self, *args, **options):
+        post_ids = Post.objects.exclude(image='').filter(
+            Q(thumbnail_url='') | Q(image_srcset='')
+        ).values_list('id', flat=True)
+        total = 0
+        for post_id in post_ids.iterator():
+            if thumbnails.generate(post_id) is not None:
+                total += 1
+        self.stdout.write(f'Создано миниатюр: {total}')
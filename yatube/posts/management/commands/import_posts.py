@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, группы, посты, комментарии и подписки '
+        'из NDJSON или CSV'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', nargs='?', default='-',
+            help='Файл для загрузки (по умолчанию стандартный ввод)'
+        )
+        parser.add_argument(
+            '--format', choices=sorted(transfer.READERS),
+            help='Формат файла (по умолчанию по расширению)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=transfer.BATCH_SIZE,
+            help='Сколько записей вставлять за раз'
+        )
+
+    def handle(self, *args, **options):
+        path = options['input']
+        file_format = options['format'] or transfer.guess_format(path)
+        importer = transfer.Importer(options['batch_size'], self.report)
+        read = transfer.READERS[file_format]
+        try:
+            if path == '-':
+                imported, skipped = importer.run(read(sys.stdin))
+            else:
+                with open(path, encoding='utf-8', newline='') as stream:
+                    imported, skipped = importer.run(read(stream))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        for kind in transfer.ORDER:
+            self.stdout.write(
+                f'{kind}: загружено {imported[kind]}, '
+                f'пропущено {skipped[kind]}'
+            )
+        if skipped['unknown']:
+            self.stdout.write(
+                f'Записей неизвестного типа: {skipped["unknown"]}'
+            )
+
+    def report(self, kind, total, elapsed):
+        self.stdout.write(
+            f'{kind}: {total} ({total / max(elapsed, 1e-6):.0f} в секунду)'
+        )
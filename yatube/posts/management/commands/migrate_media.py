@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from core.storage import is_content_addressed
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки постов в хранилище с адресацией по содержимому'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Удалить старые файлы после переноса'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов обрабатывать за один запрос'
+        )
+
+    def batches(self, batch_size):
+        posts = Post.objects.exclude(image='').order_by('id')
+        last_id = 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id).values_list(
+                'id', 'image'
+            )[:batch_size])
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            yield batch
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        moved = missing = deleted = 0
+        old_names = set()
+        for batch in self.batches(options['batch_size']):
+            for post_id, name in batch:
+                if is_content_addressed(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    continue
+                with storage.open(name) as source:
+                    new_name = storage.save(name, source)
+                moved += Post.objects.filter(pk=post_id, image=name).update(
+                    image=new_name
+                )
+                old_names.add(name)
+        if options['delete']:
+            for name in old_names:
+                if not Post.objects.filter(image=name).exists():
+                    storage.delete(name)
+                    deleted += 1
+        self.stdout.write(
+            f'Перенесено картинок: {moved}, не найдено файлов: {missing}, '
+            f'удалено старых файлов: {deleted}'
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс постов'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = get_backend().rebuild()
+        self.stdout.write(f'Проиндексировано постов: {total}')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок'
+
+    def handle(self, *args, **options):
+        for name, total in counters.recount().items():
+            self.stdout.write(f'Пересчитано ({name}): {total}')
@@ -0,0 +1,75 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:03
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    keep = Follow.objects.values('user', 'author').annotate(
+        first_id=Min('id')
+    ).values('first_id')
+    duplicates = Follow.objects.exclude(id__in=keep)
+    user_ids = set()
+    for pair in duplicates.values_list('user_id', 'author_id'):
+        user_ids.update(pair)
+    if not user_ids:
+        return
+    duplicates.delete()
+    UserStats.objects.filter(user_id__in=user_ids).update(
+        followers_count=count(Follow.objects.all(), 'author'),
+        following_count=count(Follow.objects.all(), 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_counters'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['created', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-pub_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created', 'id'], name='posts_comme_post_id_9660d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='posts_post_pub_dat_d3c0cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='posts_post_author__075f1d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='posts_post_group_i_6a7ae9_idx'),
+        ),
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
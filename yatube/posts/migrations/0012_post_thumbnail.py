@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_url',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+    ]
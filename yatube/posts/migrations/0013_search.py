@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+FTS_TABLE = 'posts_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(text)'
+        )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE}(rowid, text) SELECT id, text FROM posts_post'
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post')),
+            ],
+            options={
+                'unique_together': {('term', 'post')},
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', '-id'], name='posts_follo_user_id_9a7c72_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['author', '-id'], name='posts_follo_author__59acdf_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_srcset',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
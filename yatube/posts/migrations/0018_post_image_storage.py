@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:30
+
+from django.db import migrations, models
+import core.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/'),
+        ),
+    ]
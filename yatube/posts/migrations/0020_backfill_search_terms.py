@@ -0,0 +1,47 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations
+
+FTS_TABLE = 'posts_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+BATCH_SIZE = 500
+
+
+def backfill_search_terms(apps, schema_editor):
+    tables = schema_editor.connection.introspection.table_names()
+    backend = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if backend == 'fts5' or (backend == 'auto' and FTS_TABLE in tables):
+        return
+    Post = apps.get_model('posts', 'Post')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    max_length = SearchTerm._meta.get_field('term').max_length
+    indexed = SearchTerm.objects.values('post_id')
+    posts = Post.objects.exclude(id__in=indexed).values_list('id', 'text')
+    terms = []
+    for post_id, text in posts.iterator():
+        weights = Counter(
+            token[:max_length] for token in TOKEN_RE.findall(text.lower())
+        )
+        terms.extend(
+            SearchTerm(term=term, post_id=post_id, weight=weight)
+            for term, weight in weights.items()
+        )
+        if len(terms) >= BATCH_SIZE:
+            SearchTerm.objects.bulk_create(terms)
+            terms = []
+    SearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_search_terms, migrations.RunPython.noop
+        ),
+    ]
@@ -1,25 +1,53 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from core.storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
-class Group(models.Model):
+class ManagedFieldsMixin:
+    managed_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.managed_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+# Referenced by migration 0010; kept so historical states stay importable.
+CounterFieldsMixin = ManagedFieldsMixin
+
+
+class Group(ManagedFieldsMixin, models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    managed_fields = ('posts_count',)
 
     def __str__(self):
         return self.title
 
-    @property
-    def posts_count(self):
-        return self.posts.count()
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        return self.select_related('group', 'author')
 
 
-class Post(models.Model):
+class Post(ManagedFieldsMixin, models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -34,14 +62,50 @@ class Post(models.Model):
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_url = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False
+    )
+    thumbnail_width = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_height = models.PositiveIntegerField(null=True, editable=False)
+    image_srcset = models.TextField(blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    managed_fields = (
+        'comments_count',
+        'thumbnail_url',
+        'thumbnail_width',
+        'thumbnail_height',
+        'image_srcset',
+        'image_placeholder',
+    )
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['author', '-pub_date', '-id']),
+            models.Index(fields=['group', '-pub_date', '-id']),
+        ]
 
 
 class Comment(models.Model):
@@ -58,6 +122,12 @@ class Comment(models.Model):
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['created', 'id']
+        indexes = [
+            models.Index(fields=['post', 'created', 'id']),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -70,3 +140,68 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-id']),
+            models.Index(fields=['author', '-id']),
+        ]
+
+
+class UserStats(ManagedFieldsMixin, models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    managed_fields = ('posts_count', 'followers_count', 'following_count')
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post']),
+            models.Index(fields=['user', 'author']),
+        ]
+
+
+class SearchTerm(models.Model):
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('term', 'post')
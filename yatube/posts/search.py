@@ -0,0 +1,145 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, IntegerField, Sum, Value
+
+from .models import Post, SearchTerm
+
+FTS_TABLE = 'posts_post_fts'
+TOKEN_RE = re.compile(r'\w+')
+ORDERING = ('-rank', '-pub_date', '-id')
+
+
+def tokenize(text):
+    return [
+        token[:SearchTerm._meta.get_field('term').max_length]
+        for token in TOKEN_RE.findall(text.lower())
+    ]
+
+
+class FTS5Backend:
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)',
+                [post.id, post.text]
+            )
+
+    def index_many(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_ids
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) SELECT id, text '
+                f'FROM posts_post WHERE id IN ({placeholders})',
+                post_ids
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) '
+                'SELECT id, text FROM posts_post'
+            )
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+            return cursor.fetchone()[0]
+
+    def search(self, queryset, tokens):
+        match = ' '.join('"{}"'.format(token) for token in tokens)
+        return queryset.extra(
+            select={'rank': f'-bm25({FTS_TABLE})'},
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = posts_post.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match]
+        )
+
+
+class PythonBackend:
+    def index(self, post):
+        weights = Counter(tokenize(post.text))
+        SearchTerm.objects.filter(post_id=post.id).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, post_id=post.id, weight=weight)
+            for term, weight in weights.items()
+        )
+
+    def index_many(self, post_ids):
+        posts = Post.objects.filter(pk__in=post_ids).values_list('id', 'text')
+        SearchTerm.objects.filter(post_id__in=post_ids).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, post_id=post_id, weight=weight)
+            for post_id, text in posts.iterator()
+            for term, weight in Counter(tokenize(text)).items()
+        )
+
+    def remove(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self):
+        SearchTerm.objects.all().delete()
+        total = 0
+        for post in Post.objects.only('id', 'text').iterator():
+            self.index(post)
+            total += 1
+        return total
+
+    def search(self, queryset, tokens):
+        terms = set(tokens)
+        return queryset.filter(search_terms__term__in=terms).annotate(
+            rank=Sum('search_terms__weight'),
+            matched=Count('search_terms__term', distinct=True)
+        ).filter(matched=len(terms))
+
+
+BACKENDS = {
+    'fts5': FTS5Backend(),
+    'python': PythonBackend(),
+}
+
+_detected = None
+
+
+def get_backend():
+    global _detected
+    name = settings.SEARCH_BACKEND
+    if name == 'auto':
+        if _detected is None:
+            tables = connection.introspection.table_names()
+            _detected = 'fts5' if FTS_TABLE in tables else 'python'
+        name = _detected
+    return BACKENDS[name]
+
+
+def search_posts(query, group=None, author=None):
+    tokens = tokenize(query)
+    posts = Post.objects.for_feed()
+    if group is not None:
+        posts = posts.filter(group=group)
+    if author is not None:
+        posts = posts.filter(author=author)
+    if not tokens:
+        return posts.annotate(
+            rank=Value(0, output_field=IntegerField())
+        ).none()
+    return get_backend().search(posts, tokens)
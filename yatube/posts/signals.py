@@ -0,0 +1,137 @@
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from . import counters, feed, search, thumbnails
+from .cache import invalidate_on_commit
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+DISPLAY_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def post_feeds(post, old_group_id=None):
+    return [
+        'index',
+        f'profile:{post.author_id}',
+        f'group:{post.group_id}',
+        f'group:{old_group_id}',
+    ]
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    old_group_id = getattr(instance, '_loaded_group_id', instance.group_id)
+    if created:
+        feed.fan_out(instance)
+        counters.post_created(instance)
+    elif old_group_id != instance.group_id:
+        counters.post_moved(old_group_id, instance.group_id)
+    if (instance.image.name or '') != getattr(instance, '_loaded_image', ''):
+        if not created:
+            thumbnails.reset(instance)
+        if instance.image:
+            thumbnails.schedule(instance.id)
+    search.get_backend().index(instance)
+    invalidate_on_commit(
+        *post_feeds(instance, old_group_id),
+        *feed.follower_feeds(instance.author_id)
+    )
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    search.get_backend().remove(instance.id)
+    invalidate_on_commit(
+        *post_feeds(instance), *feed.follower_feeds(instance.author_id)
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.comment_changed(instance, 1)
+    invalidate_on_commit(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_changed(instance, -1)
+    invalidate_on_commit(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    authors = Post.objects.filter(group=instance).values_list(
+        'author_id', flat=True
+    ).distinct()
+    invalidate_on_commit(
+        'index',
+        f'group:{instance.id}',
+        *(f'profile:{author_id}' for author_id in authors)
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        feed.add_author(instance.user_id, instance.author_id)
+        counters.follow_changed(instance, 1)
+        invalidate_on_commit(
+            f'follow:{instance.user_id}',
+            f'profile:{instance.author_id}',
+            f'profile:{instance.user_id}'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    feed.remove_author(instance.user_id, instance.author_id)
+    counters.follow_changed(instance, -1)
+    invalidate_on_commit(
+        f'follow:{instance.user_id}',
+        f'profile:{instance.author_id}',
+        f'profile:{instance.user_id}'
+    )
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+def display_names(user):
+    return tuple(user.__dict__.get(field) for field in DISPLAY_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_display_names(sender, instance, **kwargs):
+    instance._loaded_display_names = display_names(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_feeds(sender, instance, created, update_fields=None,
+                            **kwargs):
+    names = display_names(instance)
+    if created or names == instance._loaded_display_names:
+        return
+    if update_fields is not None and set(update_fields).isdisjoint(
+        DISPLAY_FIELDS
+    ):
+        return
+    instance._loaded_display_names = names
+    groups = Post.objects.filter(
+        author=instance, group__isnull=False
+    ).values_list('group_id', flat=True).distinct()
+    invalidate_on_commit(
+        'index',
+        f'profile:{instance.id}',
+        *(f'group:{group_id}' for group_id in groups),
+        *feed.follower_feeds(instance.id)
+    )
@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from core.metrics import record_cache
+
+from ..cache import card_key, fragment_key, get_or_build
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, feed):
+        self.nodelist = nodelist
+        self.feed = feed
+
+    def render(self, context):
+        feed = self.feed.resolve(context)
+        if not feed:
+            return self.nodelist.render(context)
+        request = context.get('request')
+        query = request.GET.urlencode() if request is not None else ''
+        key = fragment_key([feed], query)
+        return get_or_build(key, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def feedcache(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает ровно один аргумент'
+        )
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    return FeedCacheNode(nodelist, parser.compile_filter(bits[1]))
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    posts = list(posts)
+    keys = [
+        card_key(post, bool(context.get('author')), bool(context.get('group')))
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    record_cache(hits=len(cards), misses=len(keys) - len(cards))
+    missing = {}
+    card_template = context.template.engine.get_template(
+        'includes/posts.html'
+    )
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            with context.push(post=post):
+                missing[key] = card_template.render(context)
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
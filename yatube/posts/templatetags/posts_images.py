@@ -0,0 +1,9 @@
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes=None):
+    return {'post': post, 'sizes': sizes or settings.POST_IMAGE_SIZES}
@@ -0,0 +1,151 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+@override_settings(PAGE_SIZE=2)
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.author = User.objects.create_user(
+            username='Vovan', first_name='Владимир', last_name='Петров'
+        )
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост №{i}', author=cls.author, group=cls.group
+            )
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feeds_paginated_by_cursor(self):
+        """Ленты API отдают компактные посты и ссылку на следующую
+        страницу."""
+        urls = [
+            reverse('api:index'),
+            reverse('api:group_posts', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+            reverse('api:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.authorized_client.get(url).json()
+                self.assertEqual(
+                    [post['id'] for post in data['results']],
+                    [self.posts[2].id, self.posts[1].id]
+                )
+                self.assertEqual(data['results'][0], {
+                    'id': self.posts[2].id,
+                    'text': 'Пост №2',
+                    'pub_date': self.posts[2].pub_date.isoformat(),
+                    'author': 'Vovan',
+                    'author_name': 'Владимир Петров',
+                    'group': 'gogo_ahead',
+                    'image': None,
+                    'comments_count': 0,
+                })
+                self.assertIsNone(data['previous'])
+                data = self.authorized_client.get(data['next']).json()
+                self.assertEqual(
+                    [post['id'] for post in data['results']],
+                    [self.posts[0].id]
+                )
+                self.assertIsNone(data['next'])
+
+    def test_index_queries(self):
+        """Страница ленты строится одним запросом, валидатор не ходит
+        в базу."""
+        with self.assertNumQueries(1):
+            self.client.get(reverse('api:index'))
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе с первой страницей комментариев."""
+        data = self.client.get(
+            reverse('api:post_detail', args=[self.posts[0].id])
+        ).json()
+        self.assertEqual(data['comments_count'], 1)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Комментарий']
+        )
+
+    def test_errors(self):
+        """Несуществующие объекты и лента подписок гостя дают JSON-ошибку."""
+        urls = {
+            reverse('api:group_posts', args=['missing']): 404,
+            reverse('api:profile', args=['missing']): 404,
+            reverse('api:post_detail', args=[0]): 404,
+            reverse('api:follow_index'): 401,
+        }
+        for url, status in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_not_modified(self):
+        """Повторный запрос с ETag получает 304 без построения ответа,
+        а новый пост меняет ETag."""
+        url = reverse('api:index')
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            cached = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(cached.status_code, 304)
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_index_etag(self):
+        """ETag ленты подписок меняется при правке и удалении поста
+        автора и не считается по записям ленты."""
+        url = reverse('api:follow_index')
+        response = self.authorized_client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            cached = self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(cached.status_code, 304)
+        post = self.posts[2]
+        post.text = 'Исправленный пост'
+        post.save()
+        response = self.authorized_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        post.delete()
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(post.id, [
+            item['id'] for item in response.json()['results']
+        ])
+
+    def test_comment_changes_post_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        url = reverse('api:post_detail', args=[self.posts[0].id])
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(post=self.posts[0], author=self.user, text='2')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comments_count'], 2)
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from core.routers import ReplicaRouter
+
+from .. import benchmark
+from ..models import FeedEntry, Post, UserStats
+
+VIEWS = {'index', 'group_posts', 'profile', 'post_detail', 'follow_index'}
+
+
+class BenchmarkTest(TestCase):
+    def test_seed_and_measure(self):
+        """Набор данных создаётся, а замеры есть для каждой страницы."""
+        name, size = benchmark.parse_size(
+            'users=5,posts=30,follows=6,comments=10'
+        )
+        benchmark.seed(size)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertTrue(FeedEntry.objects.exists())
+        self.assertEqual(UserStats.objects.count(), 5)
+        results = benchmark.measure(requests=2)
+        self.assertEqual(set(results), VIEWS)
+        for view, stats in results.items():
+            with self.subTest(view=view):
+                self.assertGreater(stats['p95_ms'], 0)
+                self.assertGreater(stats['queries'], 0)
+
+    @override_settings(DATABASE_REPLICAS=['replica_missing'])
+    def test_measure_ignores_replicas(self):
+        """Замеры читают из базы бенчмарка, а не из реплик окружения."""
+        benchmark.seed(benchmark.parse_size(
+            'users=3,posts=5,follows=2,comments=2'
+        )[1])
+        replicas = []
+
+        def db_for_read(router, model, **hints):
+            replicas.extend(settings.DATABASE_REPLICAS)
+
+        with mock.patch.object(
+            ReplicaRouter, 'db_for_read', autospec=True,
+            side_effect=db_for_read
+        ) as routed:
+            self.assertEqual(set(benchmark.measure(requests=1)), VIEWS)
+            benchmark.throughput(requests=1)
+        self.assertTrue(routed.called)
+        self.assertEqual(replicas, [])
+
+    def test_compare_reports_regressions(self):
+        """Сравнение с эталоном находит рост запросов и задержки."""
+        baseline = {'results': {'small': {
+            'index': {'p50_ms': 1, 'p95_ms': 10, 'queries': 3}
+        }}}
+        results = {'small': {
+            'index': {'p50_ms': 1, 'p95_ms': 20, 'queries': 4}
+        }}
+        self.assertEqual(
+            len(benchmark.compare(baseline, results, tolerance=0.5)), 2
+        )
+        self.assertEqual(
+            benchmark.compare(baseline, baseline['results'], 0), []
+        )
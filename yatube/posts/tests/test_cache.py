@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..cache import fragment_key, get_or_build, get_versions, invalidate
+from ..models import Group, Post, User
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.another_user = User.objects.create_user(username='strange')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_post_invalidates_only_affected_feeds(self):
+        """Новый пост сбрасывает только ленты главной, группы и автора."""
+        feeds = [
+            'index',
+            f'group:{self.group.id}',
+            f'profile:{self.user.id}',
+            f'profile:{self.another_user.id}',
+        ]
+        before = get_versions(*feeds)
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        after = get_versions(*feeds)
+        for feed, old, new in zip(feeds[:3], before, after):
+            with self.subTest(feed=feed):
+                self.assertNotEqual(old, new)
+        self.assertEqual(before[3], after[3])
+
+    def test_author_rename_invalidates_feeds(self):
+        """Смена имени автора сбрасывает ленты с его постами, а вход
+        пользователя — нет."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        feeds = ['index', f'group:{self.group.id}', f'profile:{self.user.id}']
+        response = self.client.get(reverse('posts:home'))
+        self.assertNotContains(response, 'Николай')
+        user = User.objects.get(pk=self.user.pk)
+        before = get_versions(*feeds)
+        user.save(update_fields=['last_login'])
+        self.assertEqual(get_versions(*feeds), before)
+        user.first_name = 'Николай'
+        user.save()
+        after = get_versions(*feeds)
+        for feed, old, new in zip(feeds, before, after):
+            with self.subTest(feed=feed):
+                self.assertNotEqual(old, new)
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Николай')
+
+    def test_group_change_invalidates_old_group(self):
+        """Перенос поста в другую группу сбрасывает ленту старой группы."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group
+        )
+        post = Post.objects.get(pk=post.pk)
+        old_key = fragment_key([f'group:{self.group.id}'])
+        post.group = None
+        post.save()
+        self.assertNotEqual(
+            fragment_key([f'group:{self.group.id}']), old_key
+        )
+
+    def test_single_flight_waits_for_builder(self):
+        """При занятой блокировке запрос ждёт результата, а не строит его."""
+        key = fragment_key(['index'])
+        cache.add(key + ':lock', 1)
+        build = mock.Mock(return_value='собственная сборка')
+        with mock.patch(
+            'posts.cache.time.sleep',
+            side_effect=lambda delay: cache.set(key, 'готовый фрагмент')
+        ):
+            self.assertEqual(get_or_build(key, build), 'готовый фрагмент')
+        build.assert_not_called()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        for i in range(3):
+            cls.post = Post.objects.create(
+                text=f'Текст поста №{i}', author=cls.user
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_refreshed_on_post_edit(self):
+        """Карточка берётся из кэша, пока пост не изменён."""
+        self.client.get(reverse('posts:home'))
+        Post.objects.filter(pk=self.post.pk).update(text='В обход сигналов')
+        invalidate('index')
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Текст поста №2')
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Отредактированный текст'
+        post.save()
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'Отредактированный текст')
+
+    def test_warm_page_reads_cards_in_one_round_trip(self):
+        """Прогретая страница получает все карточки одним get_many."""
+        url = reverse('posts:profile', args=[self.user.username])
+        self.client.get(url)
+        invalidate(f'profile:{self.user.id}')
+        with mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many, mock.patch.object(
+            cache, 'set_many', wraps=cache.set_many
+        ) as set_many:
+            self.client.get(url)
+        card_calls = [
+            call for call in get_many.call_args_list
+            if str(call[0][0][0]).startswith('post_card:')
+        ]
+        self.assertEqual(len(card_calls), 1)
+        self.assertEqual(len(card_calls[0][0][0]), 3)
+        set_many.assert_not_called()
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from ..models import Comment, Follow, Group, Post, User, UserStats
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.author = User.objects.create_user(username='Vovan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая группа',
+            slug='gogo_down',
+            description='Группа для тех, кто поддерживает Вована',
+        )
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счётчики."""
+        post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group
+        )
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        post.group = self.another_group
+        post.save()
+        self.group.refresh_from_db()
+        self.another_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.another_group.posts_count, 1)
+        post.delete()
+        self.another_group.refresh_from_db()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+        self.assertEqual(self.another_group.posts_count, 0)
+
+    def test_comment_and_follow_counters(self):
+        """Комментарии и подписки меняют счётчики поста и пользователей."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.user, text='Коммент')
+        Follow.objects.create(user=self.user, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        Follow.objects.all().delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+
+    def test_stale_instance_does_not_overwrite_counter(self):
+        """Сохранение устаревшего объекта не затирает счётчик."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.user, text='Коммент')
+        post.text = 'Отредактированный пост'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_recount_command(self):
+        """Команда recount исправляет разошедшиеся счётчики."""
+        Post.objects.create(text='Пост', author=self.author, group=self.group)
+        UserStats.objects.update(posts_count=42)
+        Group.objects.update(posts_count=42)
+        call_command('recount', stdout=StringIO())
+        self.group.refresh_from_db()
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
+
+
+class DuplicateFollowsMigrationTest(TransactionTestCase):
+    before = [('posts', '0010_counters')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicates_removed_with_counters(self):
+        """Удаление повторных подписок пересчитывает счётчики подписчиков
+        и подписок."""
+        apps = self.migrate(self.before)
+        User = apps.get_model('auth', 'User')
+        Follow = apps.get_model('posts', 'Follow')
+        UserStats = apps.get_model('posts', 'UserStats')
+        user = User.objects.create(username='Kolyan')
+        author = User.objects.create(username='Vovan')
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author) for _ in range(3)
+        )
+        UserStats.objects.bulk_create([
+            UserStats(user=user, following_count=3),
+            UserStats(user=author, followers_count=3),
+        ])
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            UserStats.objects.get(user_id=user.pk).following_count, 1
+        )
+        self.assertEqual(
+            UserStats.objects.get(user_id=author.pk).followers_count, 1
+        )
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.db import check_connections
+
+
+class ConnectionSettingsTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_sqlite_pragmas_applied(self):
+        """При подключении к SQLite применяются прагмы из настроек."""
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(
+            self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size']
+        )
+
+    def test_broken_connection_closed_before_request(self):
+        """Перед запросом неработающее соединение закрывается."""
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'close') as close:
+            with mock.patch.object(
+                connection, 'is_usable', return_value=False
+            ):
+                check_connections(sender=self.__class__)
+            close.assert_called_once()
+            close.reset_mock()
+            with override_settings(DB_HEALTH_CHECKS=False):
+                with mock.patch.object(
+                    connection, 'is_usable', return_value=False
+                ):
+                    check_connections(sender=self.__class__)
+            close.assert_not_called()
@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import FeedEntry, Follow, Post, User
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.author = User.objects.create_user(username='Vovan')
+        cls.post = Post.objects.create(
+            text='Пост, написанный до подписки',
+            author=cls.author,
+        )
+
+    def feed_posts(self):
+        return list(
+            FeedEntry.objects.filter(user=self.user)
+            .values_list('post_id', flat=True)
+        )
+
+    def test_follow_fills_feed(self):
+        """Подписка переносит в ленту уже написанные посты автора."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self.feed_posts(), [self.post.id])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты всех подписчиков."""
+        Follow.objects.create(user=self.user, author=self.author)
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertIn(new_post.id, self.feed_posts())
+
+    def test_unfollow_clears_feed(self):
+        """Отписка убирает посты автора из ленты."""
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.filter(user=self.user, author=self.author).delete()
+        self.assertEqual(self.feed_posts(), [])
+
+    def test_backfill_command(self):
+        """Команда backfill_feed восстанавливает ленту по подпискам."""
+        Follow.objects.create(user=self.user, author=self.author)
+        FeedEntry.objects.all().delete()
+        call_command('backfill_feed', stdout=StringIO())
+        self.assertEqual(self.feed_posts(), [self.post.id])
+
+    def test_follow_index_cursor_mode(self):
+        """Лента подписок работает и в курсорном режиме."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.client.force_login(self.user)
+        with self.settings(PAGINATION={'posts:follow_index': 'cursor'}):
+            response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.post])
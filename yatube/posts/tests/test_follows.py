@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import follows
+from ..models import FeedEntry, Follow, Post, User, UserStats
+
+
+class FollowsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(settings.PAGE_SIZE + 2)
+        ]
+        cls.post = Post.objects.create(text='Пост', author=cls.authors[0])
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_follow_is_idempotent(self):
+        """Повторная подписка не создаёт дубликат и не меняет счётчики."""
+        author = self.authors[0]
+        self.assertTrue(follows.follow(self.user, author))
+        self.assertFalse(follows.follow(self.user, author))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.stats(author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+
+    def test_follow_self_is_ignored(self):
+        """Подписаться на самого себя нельзя."""
+        self.assertFalse(follows.follow(self.user, self.user))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_survives_race(self):
+        """Конфликт уникального индекса при гонке не роняет подписку."""
+        with mock.patch.object(
+            Follow.objects, 'create', side_effect=IntegrityError
+        ):
+            self.assertFalse(follows.follow(self.user, self.authors[0]))
+
+    def test_unfollow(self):
+        """Отписка удаляет связь и очищает ленту, повторная ничего не
+        делает."""
+        author = self.authors[0]
+        follows.follow(self.user, author)
+        self.assertTrue(follows.unfollow(self.user, author))
+        self.assertFalse(follows.unfollow(self.user, author))
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(self.stats(author).followers_count, 0)
+
+    def test_follow_many(self):
+        """Пакетная подписка добавляет только новые связи, ленту и
+        счётчики."""
+        follows.follow(self.user, self.authors[0])
+        ids = [author.id for author in self.authors[:3]] + [self.user.id]
+        with self.assertNumQueries(9):
+            created = follows.follow_many(self.user, ids)
+        self.assertEqual(created, {self.authors[1].id, self.authors[2].id})
+        self.assertEqual(self.stats(self.user).following_count, 3)
+        self.assertEqual(self.stats(self.authors[1]).followers_count, 1)
+        self.assertEqual(
+            list(FeedEntry.objects.filter(user=self.user).values_list(
+                'post_id', flat=True
+            )),
+            [self.post.id]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(follows.follow_many(self.user, ids), set())
+
+    def test_following_ids_single_query(self):
+        """Состояние подписки на N авторов выясняется одним запросом."""
+        follows.follow(self.user, self.authors[1])
+        ids = [author.id for author in self.authors]
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                follows.following_ids(self.user, ids), {self.authors[1].id}
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                follows.following_ids(AnonymousUser(), ids), set()
+            )
+
+    def test_follow_list_pages(self):
+        """Списки подписок и подписчиков листаются курсором."""
+        follows.follow_many(self.user, [author.id for author in self.authors])
+        follows.follow(self.authors[0], self.user)
+        follows.follow(self.authors[0], self.authors[-1])
+        self.client.force_login(self.authors[0])
+        url = reverse('posts:following', args=[self.user.username])
+        response = self.client.get(url)
+        page = response.context['page_obj']
+        self.assertEqual(len(page), settings.PAGE_SIZE)
+        self.assertIn(self.authors[-1], page)
+        self.assertEqual(
+            response.context['following_ids'], {self.authors[-1].id}
+        )
+        response = self.client.get(url, {'cursor': page.next_cursor})
+        rest = list(response.context['page_obj'])
+        self.assertEqual(len(rest), 2)
+        self.assertEqual(
+            set(page.object_list) | set(rest), set(self.authors)
+        )
+        response = self.client.get(
+            reverse('posts:followers', args=[self.authors[0].username])
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.user])
+        self.assertEqual(response.context['following_ids'], {self.user.id})
@@ -1,12 +1,15 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from ..forms import PostForm
 from ..models import Comment, Group, Post
 
 User = get_user_model()
@@ -66,7 +69,12 @@ class PostFormTests(TestCase):
         tested_post = Post.objects.first()
         self.assertEqual(tested_post.text, form_data.get('text'))
         self.assertEqual(tested_post.group, self.group)
-        self.assertEqual(tested_post.image, 'posts/small9999.gif')
+        self.assertRegex(
+            tested_post.image.name, r'^posts/\w\w/\w\w/[0-9a-f]{64}\.jpg$'
+        )
+        self.assertEqual(
+            (tested_post.image_width, tested_post.image_height), (2, 1)
+        )
 
     def test_change_post(self):
         """Валидная форма изменяет запись в Post."""
@@ -97,6 +105,71 @@ class PostFormTests(TestCase):
         self.assertEqual(post.group, self.group)
 
 
+def image_upload(size, mode='RGB', image_format='JPEG', name='photo.jpg',
+                 **options):
+    buffer = BytesIO()
+    Image.new(mode, size).save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_IMAGE_MAX_SIDE=100)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def save_post(self, upload):
+        form = PostForm({'text': 'Пост с картинкой'}, {'image': upload})
+        self.assertTrue(form.is_valid(), form.errors)
+        post = form.save(commit=False)
+        post.author = self.user
+        post.save()
+        return post
+
+    def test_large_image_downscaled(self):
+        """Большая картинка уменьшается, а её размеры сохраняются."""
+        post = self.save_post(image_upload((400, 200)))
+        self.assertEqual((post.image_width, post.image_height), (100, 50))
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (100, 50))
+            self.assertTrue(image.info.get('progressive'))
+
+    def test_exif_stripped(self):
+        """Метаданные EXIF не попадают в сохранённый файл, а поворот
+        из EXIF применяется к картинке."""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Camera'
+        post = self.save_post(image_upload((80, 40), exif=exif.tobytes()))
+        self.assertEqual((post.image_width, post.image_height), (40, 80))
+        with Image.open(post.image.path) as image:
+            self.assertNotIn('exif', image.info)
+
+    def test_transparent_image_to_webp(self):
+        """Картинка с прозрачностью сохраняется в WebP."""
+        post = self.save_post(image_upload(
+            (10, 10), 'RGBA', 'PNG', 'logo.png'
+        ))
+        self.assertTrue(post.image.name.endswith('.webp'))
+
+    def test_invalid_images_rejected(self):
+        """Битые и слишком большие картинки не проходят проверку."""
+        broken = SimpleUploadedFile('broken.jpg', b'not an image')
+        with self.settings(POST_IMAGE_MAX_PIXELS=100):
+            uploads = (broken, image_upload((20, 20)))
+            for upload in uploads:
+                with self.subTest(name=upload.name):
+                    form = PostForm({'text': 'Текст'}, {'image': upload})
+                    self.assertIn('image', form.errors)
+
+
 class CommentFormTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.author = User.objects.create_user(username='Vovan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'Текст поста №{i}',
+                author=cls.author if i % 2 else cls.user,
+                group=cls.group if i % 3 else None,
+            )
+            Comment.objects.create(post=post, author=cls.user, text='Ок')
+        cls.post = post
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.urls = [
+            reverse('posts:home'),
+            reverse('posts:groups', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.author.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+            reverse('posts:follow_index'),
+            reverse('posts:followers', args=[cls.author.username]),
+            reverse('posts:following', args=[cls.user.username]),
+        ]
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_views_use_indexes(self):
+        """Запросы страниц читают данные по индексам, без полной
+        выборки таблицы и сортировки во временном B-дереве."""
+        for url in self.urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(url)
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                plan = self.query_plan(sql)
+                with self.subTest(url=url, sql=sql):
+                    for step in plan:
+                        self.assertNotIn('TEMP B-TREE', step)
+                        if step.startswith('SCAN'):
+                            self.assertIn('INDEX', step)
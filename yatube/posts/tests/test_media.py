@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.http import http_date
+
+from core.media import serve
+
+from ..models import User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = b'0123456789'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.name = FileSystemStorage(TEMP_MEDIA_ROOT).save(
+            'posts/digits.jpg', ContentFile(CONTENT)
+        )
+        cls.url = settings.MEDIA_URL + cls.name
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, **headers)
+
+    def test_full_file(self):
+        """Файл отдаётся целиком с заголовками для кэширования, без
+        запросов к базе."""
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_conditional_requests(self):
+        """Совпавший ETag или неизменённая дата дают ответ 304."""
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        mtime = os.path.getmtime(os.path.join(TEMP_MEDIA_ROOT, self.name))
+        response = self.get(HTTP_IF_MODIFIED_SINCE=http_date(mtime))
+        self.assertEqual(response.status_code, 304)
+        response = self.get(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_ranges(self):
+        """Запросы диапазонов отдают только нужные байты, а файл стоит
+        на начале диапазона, чтобы сервер мог отдать его через sendfile."""
+        cases = {
+            'bytes=2-4': ('2-4', b'234'),
+            'bytes=7-': ('7-9', b'789'),
+            'bytes=-3': ('7-9', b'789'),
+            'bytes=8-100': ('8-9', b'89'),
+        }
+        for header, (content_range, content) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                file = serve(
+                    RequestFactory().get(self.url, HTTP_RANGE=header),
+                    self.name
+                ).file_to_stream
+                self.assertEqual(
+                    os.lseek(file.fileno(), 0, os.SEEK_CUR),
+                    int(content_range.split('-')[0])
+                )
+                file.close()
+                self.assertEqual(
+                    response['Content-Range'], f'bytes {content_range}/10'
+                )
+                self.assertEqual(
+                    response['Content-Length'], str(len(content))
+                )
+                self.assertEqual(
+                    b''.join(response.streaming_content), content
+                )
+        for header in ('bytes=10-', 'bytes=5-2', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_if_range(self):
+        """Устаревший If-Range возвращает файл целиком."""
+        etag = self.get()['ETag']
+        response = self.get(HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response = self.get(HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_offload(self):
+        """Отдачу файла можно переложить на веб-сервер."""
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.get()
+        self.assertEqual(
+            response['X-Accel-Redirect'], f'/protected-media/{self.name}'
+        )
+        self.assertEqual(response.content, b'')
+        with self.settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.get()
+        self.assertEqual(
+            response['X-Sendfile'], os.path.join(TEMP_MEDIA_ROOT, self.name)
+        )
+
+    def test_offload_quotes_name(self):
+        """Имя файла в X-Accel-Redirect экранируется."""
+        name = FileSystemStorage(TEMP_MEDIA_ROOT).save(
+            'posts/фото 1.jpg', ContentFile(CONTENT)
+        )
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.get(settings.MEDIA_URL + name)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/posts/%D1%84%D0%BE%D1%82%D0%BE%201.jpg'
+        )
+
+    def test_no_session_or_cache_access(self):
+        """Файл отдаётся вошедшему пользователю без чтения сессии,
+        кэша и базы, а ответ не зависит от cookie."""
+        user = User.objects.create_user(username='Kolyan')
+        self.client.force_login(user)
+        cache_methods = ('get', 'get_many', 'set', 'add', 'incr', 'delete')
+        with ExitStack() as stack:
+            mocks = [
+                stack.enter_context(mock.patch.object(LocMemCache, name))
+                for name in cache_methods
+            ]
+            load = stack.enter_context(
+                mock.patch.object(SessionStore, 'load')
+            )
+            stack.enter_context(self.assertNumQueries(0))
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        for method in (*mocks, load):
+            self.assertFalse(method.called)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertFalse(response.cookies)
+
+    def test_missing_files(self):
+        """Несуществующие пути, каталоги и выход за MEDIA_ROOT дают 404."""
+        for path in ('posts/none.jpg', 'posts/', '../manage.py'):
+            with self.subTest(path=path):
+                response = self.get(settings.MEDIA_URL + path)
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import registry
+from ..models import Group, Post, User
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        Post.objects.create(text='Пост', author=cls.user, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_view_metrics_recorded(self):
+        """Запросы, время БД и шаблонов учитываются по имени view."""
+        self.client.get(reverse('posts:home'))
+        self.client.get(reverse('posts:home'))
+        queries = registry.queries
+        self.assertEqual(queries.counts['posts:home'][-1], 0)
+        self.assertEqual(sum(queries.counts['posts:home']), 2)
+        self.assertGreater(queries.sums['posts:home'], 0)
+        self.assertGreater(registry.db_time.sums['posts:home'], 0)
+        self.assertGreater(registry.template_time.sums['posts:home'], 0)
+        self.assertLessEqual(
+            registry.template_time.sums['posts:home'],
+            registry.duration.sums['posts:home'],
+        )
+
+    def test_cache_hits_and_misses_recorded(self):
+        """Промахи и попадания в кэш фрагментов считаются отдельно."""
+        self.client.get(reverse('posts:home'))
+        self.assertEqual(registry.cache_hits.values['posts:home'], 0)
+        self.assertGreater(registry.cache_misses.values['posts:home'], 0)
+        self.client.get(reverse('posts:home'))
+        self.assertGreater(registry.cache_hits.values['posts:home'], 0)
+
+    def test_metrics_endpoint(self):
+        """/metrics отдаёт гистограммы в текстовом формате Prometheus."""
+        self.client.get(reverse('posts:groups', args=[self.group.slug]))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn('# TYPE yatube_db_queries histogram', content)
+        self.assertIn(
+            'yatube_db_queries_bucket{view="posts:groups",le="+Inf"} 1',
+            content
+        )
+        self.assertIn('yatube_cache_misses_total{view="posts:groups"}',
+                      content)
+
+    def test_metrics_endpoint_restricted(self):
+        """/metrics недоступен с посторонних адресов и при отключении."""
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, 404)
+        with override_settings(METRICS_ENABLED=False):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
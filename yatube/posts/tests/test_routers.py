@@ -0,0 +1,96 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.routers import ReplicaRouter
+from ..cache import invalidate
+from ..models import Comment, Post, User
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.user = User.objects.create_user(username='Kolyan')
+        self.post = Post.objects.create(
+            text='Пост, который есть на репликах', author=self.user
+        )
+        connection.ensure_connection()
+        for alias in REPLICAS:
+            path = os.path.join(self.directory, f'{alias}.sqlite3')
+            replica = sqlite3.connect(path)
+            connection.connection.backup(replica)
+            replica.close()
+            connections.databases[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': path
+            }
+        Post.objects.create(
+            text='Пост, который ещё не доехал до реплик', author=self.user
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def get_index(self, client):
+        invalidate('index')
+        return client.get(reverse('posts:home'))
+
+    def test_reads_go_to_replica(self):
+        """Чтение страниц постов идёт с реплики, запись на основную базу."""
+        captured = [
+            CaptureQueriesContext(connections[alias]) for alias in REPLICAS
+        ]
+        for context in captured:
+            context.__enter__()
+        response = self.get_index(self.client)
+        for context in captured:
+            context.__exit__(None, None, None)
+        self.assertContains(response, 'есть на репликах')
+        self.assertNotContains(response, 'не доехал')
+        self.assertEqual(
+            sorted(len(context) > 0 for context in captured), [False, True]
+        )
+
+    def test_writer_pinned_to_primary(self):
+        """После записи пользователь какое-то время читает с основной
+        базы, остальные продолжают читать с реплики."""
+        self.assertNotContains(
+            self.get_index(self.authorized_client), 'не доехал'
+        )
+        self.authorized_client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            {'text': 'Комментарий'}
+        )
+        self.assertTrue(Comment.objects.using('default').exists())
+        self.assertFalse(Comment.objects.using('replica_1').exists())
+        self.assertContains(
+            self.get_index(self.authorized_client), 'не доехал'
+        )
+        self.assertNotContains(self.get_index(self.client), 'не доехал')
+        cache.clear()
+        self.assertNotContains(
+            self.get_index(self.authorized_client), 'не доехал'
+        )
+
+    def test_no_request_uses_primary(self):
+        """Вне запроса роутер не выбирает реплику."""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica_1', 'posts'))
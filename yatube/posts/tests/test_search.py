@@ -0,0 +1,136 @@
+from importlib import import_module
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, SearchTerm, User
+
+BACKENDS = ('fts5', 'python')
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.another_user = User.objects.create_user(username='Vovan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('posts:search'), params)
+        return list(response.context['page_obj'])
+
+    def create_posts(self):
+        rare = Post.objects.create(
+            text='Сегодня ходил за грибами', author=self.user
+        )
+        often = Post.objects.create(
+            text='Грибы, грибы и снова Грибы', author=self.another_user,
+            group=self.group
+        )
+        other = Post.objects.create(text='Про рыбалку', author=self.user)
+        return rare, often, other
+
+    def test_search_ranks_results(self):
+        """Поиск находит посты без учёта регистра и ранжирует их."""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(
+                SEARCH_BACKEND=backend
+            ):
+                Post.objects.all().delete()
+                rare, often, other = self.create_posts()
+                rare.text = 'Сегодня ходил за грибы'
+                rare.save()
+                self.assertEqual(self.search(q='ГРИБЫ'), [often, rare])
+
+    def test_search_filters(self):
+        """Поиск учитывает фильтры по группе и автору."""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(
+                SEARCH_BACKEND=backend
+            ):
+                Post.objects.all().delete()
+                rare, often, other = self.create_posts()
+                self.assertEqual(
+                    self.search(q='грибы', group=self.group.slug), [often]
+                )
+                self.assertEqual(
+                    self.search(q='рыбалку', author=self.user.username),
+                    [other]
+                )
+                self.assertEqual(
+                    self.search(q='рыбалку', author=self.another_user), []
+                )
+
+    def test_deleted_post_not_found(self):
+        """Удалённый пост пропадает из выдачи."""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(
+                SEARCH_BACKEND=backend
+            ):
+                Post.objects.all().delete()
+                self.create_posts()
+                Post.objects.filter(text='Про рыбалку').delete()
+                self.assertEqual(self.search(q='рыбалку'), [])
+
+    @override_settings(PAGE_SIZE=1)
+    def test_paginator_keeps_query(self):
+        """Ссылки пагинатора сохраняют поисковый запрос."""
+        self.create_posts()
+        Post.objects.create(text='Опять грибы', author=self.user)
+        response = self.client.get(reverse('posts:search'), {'q': 'грибы'})
+        expected = '?' + urlencode({'q': 'грибы', 'page': 2})
+        self.assertContains(response, expected.replace('&', '&amp;'))
+
+    def test_empty_query(self):
+        """Пустой запрос и запрос без слов открывают пустую выдачу."""
+        self.create_posts()
+        for params in ({}, {'q': '!!!'}):
+            for mode in ('offset', 'cursor'):
+                pagination = {'posts:search': mode}
+                with self.subTest(params=params, mode=mode), \
+                        override_settings(PAGINATION=pagination):
+                    response = self.client.get(
+                        reverse('posts:search'), params
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(list(response.context['page_obj']), [])
+
+    @override_settings(PAGE_SIZE=1, PAGINATION={'posts:search': 'cursor'})
+    def test_cursor_mode_falls_back_to_pages(self):
+        """Выдача, упорядоченная по релевантности, листается по номерам
+        страниц даже в курсорном режиме."""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), override_settings(
+                SEARCH_BACKEND=backend
+            ):
+                Post.objects.all().delete()
+                self.create_posts()
+                again = Post.objects.create(
+                    text='Опять грибы', author=self.user
+                )
+                response = self.client.get(
+                    reverse('posts:search'), {'q': 'грибы', 'page': 2}
+                )
+                page_obj = response.context['page_obj']
+                self.assertEqual(page_obj.number, 2)
+                self.assertEqual(list(page_obj), [again])
+
+    @override_settings(SEARCH_BACKEND='python')
+    def test_migration_backfills_search_terms(self):
+        """Миграция заполняет индекс запасного поиска для уже
+        существующих постов."""
+        self.create_posts()
+        SearchTerm.objects.all().delete()
+        migration = import_module(
+            'posts.migrations.0020_backfill_search_terms'
+        )
+        migration.backfill_search_terms(apps, connection.schema_editor())
+        self.assertEqual(len(self.search(q='рыбалку')), 1)
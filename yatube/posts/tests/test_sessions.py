@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.auth import USER_KEY
+from ..models import User
+
+
+class CachedAuthTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            self.authorized_client.get(url)
+        return len(captured)
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        """Повторный запрос берёт сессию и пользователя из кэша."""
+        url = reverse('posts:follow_index')
+        cache.clear()
+        cold = self.count_queries(url)
+        self.assertEqual(self.count_queries(url), cold - 2)
+
+    def test_user_save_invalidates_cache(self):
+        """Изменение пользователя сбрасывает его копию в кэше."""
+        url = reverse('posts:follow_index')
+        self.authorized_client.get(url)
+        self.assertIsNotNone(cache.get(USER_KEY.format(self.user.pk)))
+        self.user.first_name = 'Николай'
+        self.user.save()
+        self.assertIsNone(cache.get(USER_KEY.format(self.user.pk)))
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Николай')
+
+    def test_password_change_logs_out(self):
+        """Смена пароля завершает сессию даже при закэшированном
+        пользователе."""
+        url = reverse('posts:follow_index')
+        self.authorized_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        User.objects.filter(pk=user.pk).update(password=user.password)
+        cache.set(USER_KEY.format(user.pk), user)
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_logout_forgets_user(self):
+        """Выход из аккаунта удаляет пользователя из кэша."""
+        self.authorized_client.get(reverse('posts:follow_index'))
+        self.authorized_client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(USER_KEY.format(self.user.pk)))
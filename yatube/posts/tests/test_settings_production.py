@@ -0,0 +1,88 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from redislite import Redis
+
+FIRST_PROCESS = '''
+import django
+django.setup()
+from django.core.management import call_command
+from django.test import Client
+call_command('migrate', verbosity=0)
+from posts.models import Post, User
+user = User.objects.create_user(username='Kolyan')
+Post.objects.create(text='Первая версия поста', author=user)
+print(Client().get('/').content.decode())
+'''
+
+SECOND_PROCESS = '''
+import django
+django.setup()
+from django.test import Client
+from posts.models import Post
+Post.objects.update(text='Вторая версия поста')
+print(Client().get('/').content.decode())
+'''
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE='yatube.settings_production',
+            DJANGO_SECRET_KEY='production-settings-test',
+            DJANGO_ALLOWED_HOSTS='testserver',
+            DB_NAME=os.path.join(self.directory, 'db.sqlite3'),
+            CACHE_BACKEND='redis',
+        )
+
+    def run_process(self, code, returncode=0):
+        result = subprocess.run(
+            [sys.executable, '-c', code], env=self.env, cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120,
+        )
+        self.assertEqual(
+            result.returncode, returncode, result.stderr.decode()
+        )
+        return result.stdout.decode() + result.stderr.decode()
+
+    def test_local_caches_rejected(self):
+        """Файловый и локальный кэши без общих атомарных add/incr
+        запрещены."""
+        for backend in ('file', 'locmem'):
+            with self.subTest(backend=backend):
+                self.env['CACHE_BACKEND'] = backend
+                output = self.run_process(
+                    'import django\ndjango.setup()', returncode=1
+                )
+                self.assertIn('ImproperlyConfigured', output)
+                self.assertIn('CACHE_BACKEND', output)
+
+    def test_metrics_closed_by_default(self):
+        """За фронтовым сервером /metrics закрыт, пока адреса не заданы
+        явно."""
+        code = (
+            'import django\ndjango.setup()\n'
+            'from django.test import Client\n'
+            'print(Client().get("/metrics").status_code)'
+        )
+        self.assertEqual(self.run_process(code).strip(), '404')
+        self.env['METRICS_ALLOWED_IPS'] = '127.0.0.1'
+        self.assertEqual(self.run_process(code).strip(), '200')
+
+    def test_processes_share_cached_index(self):
+        """Второй процесс получает главную из общего кэша Redis."""
+        redis = Redis(os.path.join(self.directory, 'redis.db'))
+        self.addCleanup(redis.shutdown)
+        self.env['CACHE_LOCATION'] = f'unix://{redis.socket_file}'
+        self.assertIn('Первая версия поста', self.run_process(FIRST_PROCESS))
+        output = self.run_process(SECOND_PROCESS)
+        self.assertIn('Первая версия поста', output)
+        self.assertNotIn('Вторая версия поста', output)
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.storage import ContentAddressedStorage, is_content_addressed
+
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+
+    def test_files_sharded_by_hash(self):
+        """Файл кладётся в подкаталоги по первым символам своего хэша."""
+        name = self.storage.save('posts/Photo.JPG', ContentFile(b'photo'))
+        digest = os.path.basename(name).split('.')[0]
+        self.assertEqual(
+            name, f'posts/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+        )
+        self.assertTrue(is_content_addressed(name))
+        self.assertFalse(is_content_addressed('posts/photo.jpg'))
+
+    def test_identical_uploads_stored_once(self):
+        """Одинаковые файлы хранятся один раз, разные — отдельно."""
+        first = self.storage.save('posts/a.jpg', ContentFile(b'same'))
+        second = self.storage.save('posts/b.jpg', ContentFile(b'same'))
+        other = self.storage.save('posts/c.jpg', ContentFile(b'other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        directory = os.path.dirname(self.storage.path(first))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first)])
+
+    def test_media_served_immutable(self):
+        """Файлы по хэшу отдаются с бессрочным кэшированием."""
+        name = self.storage.save('posts/a.jpg', ContentFile(b'image'))
+        legacy = FileSystemStorage().save('posts/a.jpg', ContentFile(b'x'))
+        response = self.client.get(settings.MEDIA_URL + name)
+        self.assertEqual(b''.join(response.streaming_content), b'image')
+        self.assertIn('immutable', response['Cache-Control'])
+        response = self.client.get(settings.MEDIA_URL + legacy)
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_migrate_media_command(self):
+        """Команда переносит старые файлы и схлопывает дубликаты."""
+        legacy = FileSystemStorage()
+        names = [
+            legacy.save(f'posts/{name}.gif', ContentFile(b'gif'))
+            for name in ('first', 'second')
+        ]
+        posts = [
+            Post.objects.create(text='Пост', author=self.user, image=name)
+            for name in names + ['posts/missing.gif']
+        ]
+        call_command('migrate_media', '--delete', stdout=StringIO())
+        images = [
+            Post.objects.get(pk=post.pk).image.name for post in posts
+        ]
+        self.assertTrue(is_content_addressed(images[0]))
+        self.assertEqual(images[0], images[1])
+        self.assertEqual(images[2], 'posts/missing.gif')
+        for name in names:
+            self.assertFalse(legacy.exists(name))
+        self.assertTrue(legacy.exists(images[0]))
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, name='small.gif'):
+        return Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
+        )
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюра не готова, вместо картинки выводится заглушка."""
+        post = self.create_post()
+        self.assertEqual(post.thumbnail_url, '')
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, 'aspect-ratio: 960 / 339')
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_thumbnail_stored_on_save(self):
+        """Миниатюра создаётся при сохранении и берётся из поста."""
+        post = self.create_post()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
+        self.assertEqual(
+            (post.thumbnail_width, post.thumbnail_height), (960, 339)
+        )
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, f'src="{post.thumbnail_url}"')
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_srcset_and_placeholder(self):
+        """Вместе с миниатюрой создаются узкие варианты для srcset и
+        встроенная заглушка, а картинка грузится лениво."""
+        post = self.create_post()
+        post.refresh_from_db()
+        widths = [
+            candidate.rsplit(' ', 1)[1]
+            for candidate in post.image_srcset.split(', ')
+        ]
+        self.assertEqual(widths, ['320w', '640w', '960w'])
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,')
+        )
+        response = self.client.get(reverse('posts:home'))
+        self.assertContains(response, f'srcset="{post.image_srcset}"')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, post.image_placeholder)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.id])
+        )
+        self.assertContains(response, 'sizes="(max-width: 767px) 100vw')
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_thumbnail_kept_on_text_edit(self):
+        """Правка текста не сбрасывает готовую миниатюру."""
+        post = Post.objects.get(pk=self.create_post().pk)
+        post.text = 'Новый текст'
+        post.save()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
@@ -0,0 +1,181 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import (
+    Comment, FeedEntry, Follow, Group, Post, User, UserStats
+)
+from ..search import search_posts
+from ..transfer import Importer, export_records
+
+
+class TransferTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.user = User.objects.create_user(
+            username='Kolyan', first_name='Николай'
+        )
+        self.author = User.objects.create_user(username='Vovan')
+        self.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        self.pub_date = timezone.now() - datetime.timedelta(days=30)
+        self.posts = [
+            Post.objects.create(
+                text=f'Грибной пост №{i}', author=self.author,
+                group=self.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        Post.objects.filter(pk=self.posts[0].pk).update(
+            pub_date=self.pub_date
+        )
+        Comment.objects.create(
+            post=self.posts[1], author=self.user, text='Комментарий'
+        )
+        Follow.objects.create(user=self.user, author=self.author)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pub_date', 'text').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            )),
+            list(Comment.objects.values_list(
+                'post__text', 'author__username', 'text', 'created'
+            )),
+            list(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+            list(User.objects.order_by('username').values_list(
+                'username', 'first_name'
+            )),
+        )
+
+    def round_trip(self, file_name, **options):
+        path = os.path.join(self.directory, file_name)
+        before = self.snapshot()
+        call_command('export_posts', path, stderr=io.StringIO())
+        for model in (Comment, Follow, Post, Group, User):
+            model.objects.all().delete()
+        call_command('import_posts', path, stdout=io.StringIO(), **options)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_round_trip_ndjson(self):
+        """Выгрузка и загрузка NDJSON сохраняют даты и связи."""
+        self.round_trip('posts.ndjson')
+        self.assertEqual(
+            Post.objects.get(text=self.posts[0].text).pub_date, self.pub_date
+        )
+
+    def test_round_trip_csv_in_small_batches(self):
+        """CSV загружается пачками с сохранением порядка зависимостей."""
+        self.round_trip('posts.csv', batch_size=2)
+
+    def test_import_rebuilds_derived_data(self):
+        """После загрузки пересобраны ленты, счётчики и поиск."""
+        self.round_trip('posts.ndjson')
+        user = User.objects.get(username='Kolyan')
+        author = User.objects.get(username='Vovan')
+        self.assertEqual(
+            FeedEntry.objects.filter(user=user).count(), len(self.posts)
+        )
+        self.assertEqual(UserStats.objects.get(user=author).posts_count, 5)
+        self.assertEqual(UserStats.objects.get(user=user).following_count, 1)
+        self.assertEqual(Group.objects.get().posts_count, 2)
+        self.assertEqual(Post.objects.get(text=self.posts[1].text)
+                         .comments_count, 1)
+        self.assertEqual(search_posts('грибной').count(), len(self.posts))
+
+    def test_import_is_idempotent_and_skips_broken_records(self):
+        """Повторная загрузка ничего не дублирует, битые записи
+        пропускаются."""
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_posts', path, stderr=io.StringIO())
+        with open(path, 'a', encoding='utf-8') as stream:
+            stream.write(
+                '{"type": "post", "id": 999, "author": "nobody"}\n'
+                '{"type": "like", "id": 1}\n'
+            )
+        before = self.snapshot()
+        out = io.StringIO()
+        call_command('import_posts', path, stdout=out)
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn('post: загружено 0, пропущено 6', out.getvalue())
+        self.assertIn('Записей неизвестного типа: 1', out.getvalue())
+
+    def test_import_into_database_with_same_ids(self):
+        """Записи с занятыми id загружаются как новые, а комментарии
+        привязываются к своим постам, а не к чужим с тем же id."""
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_posts', path, stderr=io.StringIO())
+        Comment.objects.all().delete()
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        strangers = [
+            Post(id=post.id, text=f'Чужой пост №{i}', author=self.user)
+            for i, post in enumerate(self.posts)
+        ]
+        Post.objects.bulk_create(strangers)
+        call_command('import_posts', path, stdout=io.StringIO())
+        self.assertEqual(Post.objects.count(), 2 * len(self.posts))
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post.text, self.posts[1].text)
+        self.assertEqual(comment.post.comments_count, 1)
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.user).count(), len(self.posts)
+        )
+        self.assertEqual(search_posts('грибной').count(), len(self.posts))
+        self.assertFalse(Comment.objects.filter(
+            post_id__in=[post.id for post in strangers]
+        ).exists())
+
+    def test_import_touches_only_imported_data(self):
+        """Загрузка не пересобирает данные, которых она не касалась."""
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_posts', path, stderr=io.StringIO())
+        outsider = User.objects.create_user(username='Petrovich')
+        UserStats.objects.filter(user=outsider).update(posts_count=42)
+        call_command('import_posts', path, stdout=io.StringIO())
+        self.assertEqual(
+            UserStats.objects.get(user=outsider).posts_count, 42
+        )
+
+    def test_import_keeps_no_state_between_batches(self):
+        """Счётчики пересчитываются после каждой пачки, и импортёр не
+        копит сведения о загруженных записях."""
+        records = list(export_records())
+        for model in (Comment, Follow, Post, Group, User):
+            model.objects.all().delete()
+        checked = []
+
+        def progress(kind, total, elapsed):
+            for user in User.objects.select_related('stats'):
+                self.assertEqual(
+                    user.stats.posts_count, user.posts.count()
+                )
+            for post in Post.objects.all():
+                self.assertEqual(post.comments_count, post.comments.count())
+            checked.append(kind)
+            self.assertEqual(importer.feeds, set())
+
+        importer = Importer(batch_size=2, progress=progress)
+        imported, _ = importer.run(records)
+        self.assertEqual(imported['post'], len(self.posts))
+        self.assertEqual(imported['comment'], 1)
+        self.assertIn('comment', checked)
+        self.assertEqual(
+            (importer.touched_users, importer.touched_groups,
+             importer.touched_posts),
+            (set(), set(), set())
+        )
@@ -1,4 +1,6 @@
 
+import base64
+import json
 import shutil
 import tempfile
 
@@ -7,11 +9,17 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.paginator import Page
+from django.db import connection
+from django.template import engines
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.query_budget import QueryBudgetExceeded, query_budget
+
 from ..forms import PostForm, CommentForm
 from ..models import Follow, Group, Post, User, Comment
+from ..utils import FeedPaginator
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -117,13 +125,22 @@ class PostTest(TestCase):
     def test_for_correct_work_cache(self):
         """Тест на корректное сохранение информации в кэше"""
         content = self.client.get(reverse('posts:home')).content
-        Post.objects.all().delete()
-        content_after_delete = self.client.get(reverse('posts:home')).content
-        self.assertEqual(content, content_after_delete)
+        Post.objects.update(text='Текст, изменённый в обход сигналов')
+        content_after_update = self.client.get(reverse('posts:home')).content
+        self.assertEqual(content, content_after_update)
         cache.clear()
         content_empty_cache = self.client.get(reverse('posts:home')).content
         self.assertNotEqual(content, content_empty_cache)
 
+    def test_cache_invalidated_on_post_delete(self):
+        """Удаление поста сразу сбрасывает кэш затронутых лент."""
+        urls = list(self.urls_with_paginator.values())
+        contents = [self.client.get(url).content for url in urls]
+        Post.objects.all().delete()
+        for url, content in zip(urls, contents):
+            with self.subTest(url=url):
+                self.assertNotEqual(self.client.get(url).content, content)
+
     def checking_for_attributes(self, context, is_page=True):
         if is_page:
             page = context.get('page_obj')
@@ -165,7 +182,7 @@ class PostTest(TestCase):
         )).context
         self.checking_for_attributes(context, False)
         self.assertIsInstance(context.get('form'), CommentForm)
-        self.assertEqual(context.get('comments').first(), self.comment)
+        self.assertEqual(context.get('comments')[0], self.comment)
 
     def test_on_empty_another_group(self):
         """Пост не публикуется в других группах."""
@@ -217,6 +234,142 @@ class PaginatorViewsTest(TestCase):
                 )
 
 
+class ElidedPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(text=f'Пост №{i}', author=self.user) for i in range(count)
+        )
+
+    def test_page_window(self):
+        """Окно страниц: первая, последняя и соседние с текущей."""
+        self.create_posts(100)
+        paginator = FeedPaginator(Post.objects.order_by('-id'), 1)
+        ellipsis = FeedPaginator.ELLIPSIS
+        cases = {
+            1: [1, 2, 3, ellipsis, 100],
+            4: [1, 2, 3, 4, 5, 6, ellipsis, 100],
+            50: [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+            100: [1, ellipsis, 98, 99, 100],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(paginator.get_elided_page_range(number)), expected
+                )
+        paginator = FeedPaginator(Post.objects.order_by('-id')[:5], 1)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(3)), [1, 2, 3, 4, 5]
+        )
+
+    def test_count_cached_per_feed(self):
+        """Число постов ленты кэшируется до изменения ленты."""
+        self.create_posts(3)
+        objects = Post.objects.order_by('-id')
+        self.assertEqual(FeedPaginator(objects, 1, 'index').count, 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(FeedPaginator(objects, 1, 'index').count, 3)
+        Post.objects.create(text='Новый пост', author=self.user)
+        self.assertEqual(FeedPaginator(objects, 1, 'index').count, 4)
+
+    @override_settings(PAGE_SIZE=1)
+    def test_html_size_constant(self):
+        """Размер навигации не растёт вместе с числом страниц."""
+        sizes = []
+        for count in (20, 180):
+            self.create_posts(count)
+            cache.clear()
+            content = self.client.get(
+                reverse('posts:home'), {'page': 10}
+            ).content.decode()
+            sizes.append(content.count('class="page-item'))
+        self.assertEqual(sizes[0], sizes[1])
+
+
+@override_settings(PAGINATION={
+    'posts:home': 'cursor',
+    'posts:groups': 'cursor',
+    'posts:profile': 'cursor',
+})
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        cls.RANGE_CREATE = settings.PAGE_SIZE + 3
+        Post.objects.bulk_create([
+            Post(
+                text=f'Текста поста №{i}', author=cls.user, group=cls.group
+            ) for i in range(cls.RANGE_CREATE)
+        ])
+        cls.urls_with_paginator = [
+            '/',
+            f'/group/{cls.group.slug}/',
+            f'/profile/{cls.user.username}/',
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_paginator(self):
+        """Курсорная пагинация отдает страницы без пропусков и повторов."""
+        for url in self.urls_with_paginator:
+            with self.subTest(url=url):
+                page_obj = self.client.get(url).context.get('page_obj')
+                self.assertEqual(len(page_obj), settings.PAGE_SIZE)
+                self.assertFalse(page_obj.has_previous())
+                page_obj2 = self.client.get(
+                    url, {'cursor': page_obj.next_cursor}
+                ).context.get('page_obj')
+                self.assertEqual(
+                    len(page_obj2),
+                    self.RANGE_CREATE - settings.PAGE_SIZE
+                )
+                self.assertFalse(page_obj2.has_next())
+                first_ids = {post.id for post in page_obj}
+                second_ids = {post.id for post in page_obj2}
+                self.assertFalse(first_ids & second_ids)
+                page_obj_back = self.client.get(
+                    url, {'cursor': page_obj2.previous_cursor}
+                ).context.get('page_obj')
+                self.assertEqual(
+                    [post.id for post in page_obj_back],
+                    [post.id for post in page_obj]
+                )
+
+    def test_cursor_paginator_broken_cursor(self):
+        """Некорректный курсор приводит к первой странице."""
+        response = self.client.get('/', {'cursor': 'не-курсор'})
+        page_obj = response.context.get('page_obj')
+        self.assertEqual(len(page_obj), settings.PAGE_SIZE)
+        self.assertContains(response, f'?cursor={page_obj.next_cursor}')
+
+    def test_cursor_paginator_invalid_values(self):
+        """Курсор, который декодируется, но содержит негодные значения
+        полей, тоже приводит к первой странице."""
+        for values in (['garbage', '1'], ['2021-01-01T00:00:00', 'x']):
+            token = json.dumps(['next', values]).encode()
+            cursor = base64.urlsafe_b64encode(token).decode().rstrip('=')
+            with self.subTest(values=values):
+                response = self.client.get('/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                page_obj = response.context.get('page_obj')
+                self.assertEqual(len(page_obj), settings.PAGE_SIZE)
+                self.assertFalse(page_obj.has_previous())
+
+
 class FollowsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -273,3 +426,216 @@ class FollowsTest(TestCase):
         url = reverse('posts:follow_index')
         context = self.authorized_client.get(url).context.get('page_obj')
         self.assertNotIn(self.post, context)
+
+
+@override_settings(COMMENTS_PAGE_SIZE=2)
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.post = Post.objects.create(
+            text='Текст для тестирования, просто текст',
+            author=cls.user,
+        )
+        for i in range(5):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий №{i}'
+            )
+
+    def test_post_detail_shows_first_comments_page(self):
+        """На странице поста выводится только первая страница комментариев
+        и общее число комментариев."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        comments = response.context.get('comments')
+        self.assertEqual(
+            [comment.text for comment in comments],
+            ['Комментарий №0', 'Комментарий №1']
+        )
+        self.assertContains(response, 'Комментарии (5)')
+        self.assertNotContains(response, 'Комментарий №2')
+
+    def test_load_more_comments(self):
+        """Эндпоинт подгрузки отдает следующие комментарии фрагментом."""
+        url = reverse('posts:post_detail', args=[self.post.id])
+        comments = self.client.get(url).context.get('comments')
+        response = self.client.get(
+            reverse('posts:comments', args=[self.post.id]),
+            {'cursor': comments.next_cursor}
+        )
+        self.assertTemplateUsed(response, 'includes/comments.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(
+            [comment.text for comment in response.context.get('comments')],
+            ['Комментарий №2', 'Комментарий №3']
+        )
+
+    def test_comments_of_missing_post(self):
+        """Подгрузка комментариев несуществующего поста дает 404."""
+        response = self.client.get(reverse('posts:comments', args=[99999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        authors = [
+            User.objects.create_user(
+                username=f'author_{i}', first_name='Автор', last_name=str(i)
+            )
+            for i in range(settings.PAGE_SIZE + 3)
+        ]
+        for author in authors:
+            Follow.objects.create(user=cls.user, author=author)
+            post = Post.objects.create(
+                text='Текст для тестирования', author=author, group=cls.group
+            )
+            Comment.objects.create(post=post, author=cls.user, text='Ответ')
+        cls.post = post
+        Post.objects.create(text='Свой пост', author=cls.user)
+        cls.urls = {
+            'posts:home': reverse('posts:home'),
+            'posts:groups': reverse('posts:groups', args=[cls.group.slug]),
+            'posts:profile': reverse('posts:profile', args=[authors[0]]),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=[cls.post.id]
+            ),
+            'posts:comments': reverse('posts:comments', args=[cls.post.id]),
+            'posts:search': reverse('posts:search') + '?q=текст',
+            'posts:post_create': reverse('posts:post_create'),
+            'posts:post_edit': reverse(
+                'posts:post_edit', args=[cls.user.posts.get().id]
+            ),
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:followers': reverse('posts:followers', args=[authors[0]]),
+            'posts:following': reverse('posts:following', args=[cls.user]),
+        }
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_views_within_query_budget(self):
+        """Каждая страница укладывается в свой бюджет SQL-запросов."""
+        self.assertEqual(set(self.urls), set(settings.QUERY_BUDGETS))
+        for client in (self.client, self.authorized_client):
+            for view_name, url in self.urls.items():
+                with self.subTest(view_name=view_name, client=client):
+                    cache.clear()
+                    with query_budget(settings.QUERY_BUDGETS[view_name]):
+                        client.get(url)
+
+    def test_budget_reports_template_line(self):
+        """При превышении бюджета указывается строка шаблона."""
+        template = engines['django'].from_string(
+            '{% for post in posts %}\n{{ post.author.username }}{% endfor %}'
+        )
+        with self.assertRaises(QueryBudgetExceeded) as error:
+            with query_budget(1):
+                template.render({'posts': Post.objects.all()})
+        self.assertIn(':2: post.author.username', str(error.exception))
+
+    @override_settings(
+        MIDDLEWARE=[
+            *settings.MIDDLEWARE, 'core.middleware.QueryBudgetMiddleware'
+        ],
+        QUERY_BUDGETS={'posts:home': 1},
+    )
+    def test_middleware_logs_overrun(self):
+        """Middleware для стенда пишет превышение бюджета в лог."""
+        with self.assertLogs('core.query_budget', 'WARNING') as logs:
+            response = self.client.get(reverse('posts:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts/index.html', logs.output[0])
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Kolyan')
+        cls.group = Group.objects.create(
+            title='Группа поддержки Коляна',
+            slug='gogo_ahead',
+            description='Группа для тех, кто поддерживает Коляна',
+        )
+        cls.post = Post.objects.create(
+            text='Текст для тестирования', author=cls.user, group=cls.group
+        )
+        cls.urls = [
+            reverse('posts:home'),
+            reverse('posts:groups', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified_without_render(self):
+        """Повторный запрос с ETag получает 304 без рендеринга шаблона."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotIn('Last-Modified', response)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertLessEqual(len(queries), 1)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+
+    def test_changes_reset_validator(self):
+        """Правка поста, комментарий и вход пользователя меняют ETag."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+        url = reverse('posts:post_detail', args=[self.post.id])
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(post=self.post, author=self.user, text='Да')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.client.force_login(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_resets_profile_validator(self):
+        """Подписка и отписка меняют ETag профилей автора и подписчика."""
+        reader = User.objects.create_user(username='Reader')
+        urls = {
+            reverse('posts:profile', args=[self.user.username]):
+                'Подписчики: {}',
+            reverse('posts:profile', args=[reader.username]):
+                'Подписки: {}',
+        }
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        changes = [
+            lambda: Follow.objects.create(user=reader, author=self.user),
+            lambda: Follow.objects.filter(user=reader).delete(),
+        ]
+        for count, change in zip((1, 0), changes):
+            change()
+            for url, label in urls.items():
+                with self.subTest(url=url, count=count):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etags[url]
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertContains(response, label.format(count))
+                    etags[url] = response['ETag']
@@ -0,0 +1,105 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from . import feed, images
+from .cache import invalidate_on_commit
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def geometry(width):
+    base_width, base_height = map(
+        int, settings.POST_THUMBNAIL_GEOMETRY.split('x')
+    )
+    return width, round(width * base_height / base_width)
+
+
+def generate(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'image', 'author_id', 'group_id'
+    ).first()
+    if post is None or not post.image:
+        return None
+    thumbnail = get_thumbnail(
+        post.image,
+        settings.POST_THUMBNAIL_GEOMETRY,
+        **settings.POST_THUMBNAIL_OPTIONS
+    )
+    variants = [
+        get_thumbnail(
+            post.image,
+            '{}x{}'.format(*geometry(width)),
+            **settings.POST_THUMBNAIL_OPTIONS
+        )
+        for width in settings.POST_THUMBNAIL_WIDTHS
+        if width < thumbnail.width
+    ]
+    srcset = ', '.join(
+        f'{variant.url} {variant.width}w'
+        for variant in (*variants, thumbnail)
+    )
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail_url=thumbnail.url,
+        thumbnail_width=thumbnail.width,
+        thumbnail_height=thumbnail.height,
+        image_srcset=srcset,
+        image_placeholder=images.placeholder(
+            post.image, geometry(settings.POST_IMAGE_PLACEHOLDER_WIDTH)
+        ),
+        updated=timezone.now()
+    )
+    if updated:
+        invalidate_on_commit(
+            'index',
+            f'profile:{post.author_id}',
+            f'group:{post.group_id}',
+            f'post:{post.id}',
+            *feed.follower_feeds(post.author_id)
+        )
+    return thumbnail
+
+
+def _generate_in_worker(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось создать миниатюру поста %s', post_id)
+    finally:
+        connections.close_all()
+
+
+def reset(post):
+    post.thumbnail_url = ''
+    post.thumbnail_width = post.thumbnail_height = None
+    post.image_srcset = post.image_placeholder = ''
+    Post.objects.filter(pk=post.pk).update(
+        thumbnail_url='', thumbnail_width=None, thumbnail_height=None,
+        image_srcset='', image_placeholder=''
+    )
+
+
+def schedule(post_id):
+    if not settings.THUMBNAIL_ASYNC:
+        generate(post_id)
+        return
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_worker, post_id)
+    )
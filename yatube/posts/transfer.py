@@ -0,0 +1,371 @@
+import csv
+import json
+import time
+from collections import Counter, defaultdict, deque
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import cache, counters, feed, search
+from .models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE = 500
+ORDER = ('user', 'group', 'post', 'comment', 'follow')
+FIELDS = (
+    'type', 'id', 'username', 'first_name', 'last_name', 'slug', 'title',
+    'description', 'author', 'group', 'post', 'post_author', 'post_pub_date',
+    'user', 'text', 'image', 'pub_date', 'created',
+)
+
+
+def export_records(chunk_size=BATCH_SIZE):
+    users = User.objects.order_by('id').values_list(
+        'username', 'first_name', 'last_name'
+    )
+    for username, first_name, last_name in users.iterator(chunk_size):
+        yield {
+            'type': 'user', 'username': username,
+            'first_name': first_name, 'last_name': last_name,
+        }
+    groups = Group.objects.order_by('id').values_list(
+        'slug', 'title', 'description'
+    )
+    for slug, title, description in groups.iterator(chunk_size):
+        yield {
+            'type': 'group', 'slug': slug,
+            'title': title, 'description': description,
+        }
+    posts = Post.objects.order_by('id').values_list(
+        'id', 'author__username', 'group__slug', 'text', 'image', 'pub_date'
+    )
+    for post_id, author, group, text, image, pub_date in posts.iterator(
+        chunk_size
+    ):
+        yield {
+            'type': 'post', 'id': post_id, 'author': author, 'group': group,
+            'text': text, 'image': image, 'pub_date': pub_date.isoformat(),
+        }
+    comments = Comment.objects.order_by('id').values_list(
+        'id', 'post_id', 'post__author__username', 'post__pub_date',
+        'author__username', 'text', 'created'
+    )
+    for (
+        comment_id, post_id, post_author, post_pub_date, author, text,
+        created
+    ) in comments.iterator(chunk_size):
+        yield {
+            'type': 'comment', 'id': comment_id, 'post': post_id,
+            'post_author': post_author,
+            'post_pub_date': post_pub_date.isoformat(),
+            'author': author, 'text': text, 'created': created.isoformat(),
+        }
+    follows = Follow.objects.order_by('id').values_list(
+        'user__username', 'author__username'
+    )
+    for user, author in follows.iterator(chunk_size):
+        yield {'type': 'follow', 'user': user, 'author': author}
+
+
+class NDJSONWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class CSVWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+WRITERS = {'ndjson': NDJSONWriter, 'csv': CSVWriter}
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def guess_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def _as_date(value):
+    date = parse_datetime(value) if value else None
+    if date is not None and timezone.is_naive(date):
+        return timezone.make_aware(date)
+    return date
+
+
+def parse_date(value):
+    return _as_date(value) or timezone.now()
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _in_chunks(function, ids, size=BATCH_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        function(ids[start:start + size])
+
+
+class Importer:
+    def __init__(self, batch_size=BATCH_SIZE, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.batches = {kind: [] for kind in ORDER}
+        self.imported = Counter()
+        self.skipped = Counter()
+        self.feeds = set()
+        self.touched_users = set()
+        self.touched_groups = set()
+        self.touched_posts = set()
+        self.started = time.monotonic()
+
+    def run(self, records):
+        for record in records:
+            kind = record.get('type')
+            if kind not in self.batches:
+                self.skipped['unknown'] += 1
+                continue
+            self.batches[kind].append(record)
+            if len(self.batches[kind]) >= self.batch_size:
+                self.flush(kind)
+        self.flush(ORDER[-1])
+        return self.imported, self.skipped
+
+    def flush(self, kind):
+        for earlier in ORDER[:ORDER.index(kind) + 1]:
+            records = self.batches[earlier]
+            if not records:
+                continue
+            self.batches[earlier] = []
+            with transaction.atomic():
+                imported = getattr(self, f'import_{earlier}s')(records)
+                self.recount()
+            cache.invalidate(*self.feeds)
+            self.feeds.clear()
+            self.imported[earlier] += imported
+            self.skipped[earlier] += len(records) - imported
+            if self.progress is not None:
+                self.progress(
+                    earlier, self.imported[earlier],
+                    time.monotonic() - self.started
+                )
+
+    def recount(self):
+        _in_chunks(counters.recount_users, self.touched_users)
+        _in_chunks(counters.recount_groups, self.touched_groups)
+        _in_chunks(counters.recount_posts, self.touched_posts)
+        self.touched_users.clear()
+        self.touched_groups.clear()
+        self.touched_posts.clear()
+
+    def user_ids(self, records, *fields):
+        usernames = {
+            record[field] for record in records for field in fields
+            if record.get(field)
+        }
+        return dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'id')
+        )
+
+    def insert(self, model, objects, *fields):
+        if not objects:
+            return
+        last_id = model.objects.aggregate(last=Max('id'))['last'] or 0
+        model.objects.bulk_create(objects)
+        pending = defaultdict(deque)
+        for obj in objects:
+            if obj.pk is None:
+                pending[tuple(getattr(obj, field) for field in fields)].append(
+                    obj
+                )
+        if not pending:
+            return
+        rows = model.objects.filter(id__gt=last_id).order_by('id')
+        for pk, *values in rows.values_list('id', *fields).iterator():
+            queue = pending.get(tuple(values))
+            if queue:
+                queue.popleft().pk = pk
+
+    def import_users(self, records):
+        existing = self.user_ids(records, 'username')
+        password = make_password(None)
+        users = {
+            record['username']: User(
+                username=record['username'],
+                first_name=record.get('first_name', ''),
+                last_name=record.get('last_name', ''),
+                password=password,
+            )
+            for record in records
+            if record.get('username') and record['username'] not in existing
+        }
+        User.objects.bulk_create(users.values(), ignore_conflicts=True)
+        self.touched_users.update(User.objects.filter(
+            username__in=list(users)
+        ).values_list('id', flat=True))
+        return len(users)
+
+    def import_groups(self, records):
+        slugs = {record.get('slug') for record in records}
+        existing = set(
+            Group.objects.filter(slug__in=slugs).values_list('slug', flat=True)
+        )
+        groups = {
+            record['slug']: Group(
+                slug=record['slug'],
+                title=record.get('title') or record['slug'],
+                description=record.get('description', ''),
+            )
+            for record in records
+            if record.get('slug') and record['slug'] not in existing
+        }
+        Group.objects.bulk_create(groups.values(), ignore_conflicts=True)
+        return len(groups)
+
+    def import_posts(self, records):
+        authors = self.user_ids(records, 'author')
+        groups = dict(
+            Group.objects.filter(
+                slug__in={record.get('group') for record in records}
+            ).values_list('slug', 'id')
+        )
+        posts = {}
+        for record in records:
+            old_id = _as_id(record.get('id'))
+            author_id = authors.get(record.get('author'))
+            if old_id is None or author_id is None:
+                continue
+            post = Post(
+                author_id=author_id,
+                group_id=groups.get(record.get('group')),
+                text=record.get('text', ''),
+                image=record.get('image', ''),
+            )
+            posts[old_id] = post, parse_date(record.get('pub_date'))
+        existing = {
+            (author_id, pub_date, text): pk
+            for pk, author_id, pub_date, text in Post.objects.filter(
+                author_id__in={post.author_id for post, _ in posts.values()},
+                pub_date__in={date for _, date in posts.values()},
+            ).values_list('id', 'author_id', 'pub_date', 'text')
+        }
+        new_posts = {}
+        for post, pub_date in posts.values():
+            key = post.author_id, pub_date, post.text
+            if key not in existing and key not in new_posts:
+                new_posts[key] = post
+        self.insert(Post, list(new_posts.values()), 'author_id', 'text')
+        if new_posts:
+            self.feeds.add('index')
+        for (author_id, pub_date, text), post in new_posts.items():
+            post.pub_date = post.updated = pub_date
+            self.touched_users.add(author_id)
+            self.feeds.add(f'profile:{author_id}')
+            if post.group_id is not None:
+                self.touched_groups.add(post.group_id)
+                self.feeds.add(f'group:{post.group_id}')
+        Post.objects.bulk_update(new_posts.values(), ['pub_date', 'updated'])
+        new_ids = [post.pk for post in new_posts.values()]
+        self.feeds.update(
+            f'follow:{user_id}' for user_id in feed.fan_out_posts(new_ids)
+        )
+        search.get_backend().index_many(new_ids)
+        return len(new_posts)
+
+    def post_ids(self, records):
+        authors = self.user_ids(records, 'post_author')
+        keys = [
+            (
+                authors.get(record.get('post_author')),
+                _as_date(record.get('post_pub_date'))
+            )
+            for record in records
+        ]
+        posts = Post.objects.filter(
+            author_id__in={author_id for author_id, _ in keys},
+            pub_date__in={pub_date for _, pub_date in keys},
+        ).order_by('-id').values_list('author_id', 'pub_date', 'id')
+        ids = {(author_id, pub_date): pk for author_id, pub_date, pk in posts}
+        return [ids.get(key) for key in keys]
+
+    def import_comments(self, records):
+        authors = self.user_ids(records, 'author')
+        comments = {}
+        for record, post_id in zip(records, self.post_ids(records)):
+            author_id = authors.get(record.get('author'))
+            if None in (post_id, author_id):
+                continue
+            created = parse_date(record.get('created'))
+            key = post_id, author_id, created, record.get('text', '')
+            comments[key] = Comment(
+                post_id=post_id, author_id=author_id, text=key[3]
+            )
+        existing = set(Comment.objects.filter(
+            post_id__in={key[0] for key in comments},
+            created__in={key[2] for key in comments},
+        ).values_list('post_id', 'author_id', 'created', 'text'))
+        comments = {
+            key: comment for key, comment in comments.items()
+            if key not in existing
+        }
+        self.insert(
+            Comment, list(comments.values()), 'post_id', 'author_id', 'text'
+        )
+        for key, comment in comments.items():
+            comment.created = key[2]
+            self.touched_posts.add(comment.post_id)
+            self.feeds.add(f'post:{comment.post_id}')
+        Comment.objects.bulk_update(comments.values(), ['created'])
+        return len(comments)
+
+    def import_follows(self, records):
+        users = self.user_ids(records, 'user', 'author')
+        existing = set(Follow.objects.filter(
+            user_id__in=list(users.values()),
+            author_id__in=list(users.values())
+        ).values_list('user_id', 'author_id'))
+        follows = {}
+        for record in records:
+            user_id = users.get(record.get('user'))
+            author_id = users.get(record.get('author'))
+            if None in (user_id, author_id) or user_id == author_id:
+                continue
+            if (user_id, author_id) in existing:
+                continue
+            follows[user_id, author_id] = Follow(
+                user_id=user_id, author_id=author_id
+            )
+        Follow.objects.bulk_create(follows.values(), ignore_conflicts=True)
+        for user_id, author_id in follows:
+            feed.add_author(user_id, author_id)
+            self.touched_users.update((user_id, author_id))
+            self.feeds.update((
+                f'follow:{user_id}',
+                f'profile:{user_id}',
+                f'profile:{author_id}'
+            ))
+        return len(follows)
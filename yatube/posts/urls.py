@@ -9,6 +9,12 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='groups'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='comments'
+    ),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -27,4 +33,14 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following'
+    ),
 ]
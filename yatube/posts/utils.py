@@ -1,9 +1,209 @@
+import base64
+import binascii
+import json
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import get_or_build, get_versions
+
+FEED_ORDERING = ('-pub_date', '-id')
+
+
+class CursorPage:
+    cursor_based = True
+
+    def __init__(self, paginator, direction, position):
+        self.paginator = paginator
+        self.direction = direction
+        self.position = position
+
+    @cached_property
+    def _window(self):
+        per_page = self.paginator.per_page
+        backwards = self.direction == 'previous'
+        objects = self.paginator.object_list
+        if self.position is not None:
+            objects = objects.filter(
+                self.paginator.keyset(self.position, backwards)
+            )
+        if backwards:
+            objects = objects.reverse()
+        rows = list(objects[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+            return rows, has_more, True
+        return rows, self.position is not None, has_more
+
+    @cached_property
+    def object_list(self):
+        return self._window[0]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_previous(self):
+        return bool(self.object_list) and self._window[1]
+
+    def has_next(self):
+        return bool(self.object_list) and self._window[2]
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode('previous', self._window[0][0])
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode('next', self._window[0][-1])
+
+
+class CursorPaginator:
+    def __init__(self, object_list, per_page, ordering=FEED_ORDERING):
+        self.object_list = object_list.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode(self, direction, obj):
+        model_meta = self.object_list.model._meta
+        values = [
+            model_meta.get_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        token = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+    def decode(self, cursor):
+        model_meta = self.object_list.model._meta
+        try:
+            token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(token)
+            position = [
+                model_meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (
+            binascii.Error, ValueError, TypeError, ValidationError,
+            FieldDoesNotExist
+        ):
+            return 'next', None
+        if direction not in ('next', 'previous') or None in position:
+            return 'next', None
+        if len(position) != len(self.fields):
+            return 'next', None
+        return direction, position
+
+    def keyset(self, position, backwards=False):
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_page(self, cursor):
+        if not cursor:
+            return CursorPage(self, 'next', None)
+        return CursorPage(self, *self.decode(cursor))
+
+
+class FeedPage(Page):
+    @property
+    def page_window(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class FeedPaginator(Paginator):
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, feed=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return self.object_list.count()
+        version, = get_versions(self.feed)
+        key = f'feed_count:{self.feed}:{version}'
+        return get_or_build(key, self.object_list.count)
+
+    def get_elided_page_range(self, number=1, on_each_side=None,
+                              on_ends=None):
+        if on_each_side is None:
+            on_each_side = settings.PAGINATION_ON_EACH_SIDE
+        if on_ends is None:
+            on_ends = settings.PAGINATION_ON_ENDS
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+def pagination_mode(request):
+    view_name = getattr(request.resolver_match, 'view_name', None)
+    return settings.PAGINATION.get(view_name, 'offset')
+
+
+def supports_cursor(objects, ordering):
+    model_meta = objects.model._meta
+    try:
+        for field in ordering:
+            model_meta.get_field(field.lstrip('-'))
+    except FieldDoesNotExist:
+        return False
+    return True
 
 
-def paginator(request, objects):
-    paginator = Paginator(objects, settings.PAGE_SIZE)
+def paginator(request, objects, ordering=FEED_ORDERING, feed=None):
+    if (
+        pagination_mode(request) == 'cursor'
+        and supports_cursor(objects, ordering)
+    ):
+        cursor_paginator = CursorPaginator(
+            objects, settings.PAGE_SIZE, ordering
+        )
+        return cursor_paginator.get_page(request.GET.get('cursor'))
+    paginator = FeedPaginator(
+        objects.order_by(*ordering), settings.PAGE_SIZE, feed
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
@@ -1,44 +1,56 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
+from . import follows
+from .conditional import (
+    feed_condition, group_state, index_state, post_state, profile_state
+)
 from .forms import CommentForm, PostForm
-from .models import Group, Post, User, Follow
-from .utils import paginator
+from .models import Comment, FeedEntry, Group, Post, User
+from .search import ORDERING as SEARCH_ORDERING
+from .search import search_posts
+from .utils import CursorPaginator, paginator
 
+FOLLOW_ORDERING = ('-pub_date', '-post_id')
 
-@cache_page(20)
+
+@feed_condition(index_state)
 def index(request):
-    posts = Post.objects.select_related('group', 'author')
-    page_obj = paginator(request, posts)
+    feed = 'index'
+    page_obj = paginator(request, Post.objects.for_feed(), feed=feed)
     context = {
+        'feed': feed,
         'page_obj': page_obj
     }
     return render(request, 'posts/index.html', context)
 
 
+@feed_condition(group_state)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    page_obj = paginator(
-        request,
-        group.posts.select_related('group', 'author')
-    )
+    feed = f'group:{group.id}'
+    page_obj = paginator(request, group.posts.for_feed(), feed=feed)
     context = {
+        'feed': feed,
         'group': group,
         'page_obj': page_obj
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_condition(profile_state)
 def profile(request, username):
-    user = get_object_or_404(User.objects.filter(username=username))
-    page_obj = paginator(request, user.posts.select_related('group', 'author'))
-    following = (
-        request.user.is_authenticated
-        and request.user != user
-        and Follow.objects.filter(user=request.user, author=user)
+    user = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
     )
+    feed = f'profile:{user.id}'
+    page_obj = paginator(request, user.posts.for_feed(), feed=feed)
+    following = request.feed_state[1][0]
     context = {
+        'feed': feed,
         'author': user,
         'page_obj': page_obj,
         'following': following
@@ -46,13 +58,31 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+def follow_entries(user):
+    return FeedEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    )
+
+
+def comments_page(post_id, cursor):
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    )
+    return CursorPaginator(
+        comments,
+        settings.COMMENTS_PAGE_SIZE,
+        ordering=('created', 'id')
+    ).get_page(cursor)
+
+
+@feed_condition(post_state)
 def post_detail(request, post_id):
     post = get_object_or_404(
-        Post.objects.select_related('group', 'author'),
+        Post.objects.select_related('group', 'author__stats'),
         id=post_id
     )
     form = CommentForm()
-    comments = post.comments.select_related('author')
+    comments = comments_page(post.id, None)
     context = {
         'post': post,
         'form': form,
@@ -61,6 +91,34 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    group = author = None
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+    if request.GET.get('author'):
+        author = get_object_or_404(User, username=request.GET['author'])
+    posts = search_posts(query, group=group, author=author)
+    page_obj = paginator(request, posts, ordering=SEARCH_ORDERING)
+    context = {
+        'query': query,
+        'search_group': group,
+        'search_author': author,
+        'page_obj': page_obj
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def post_comments(request, post_id):
+    if not Post.objects.filter(id=post_id).exists():
+        raise Http404
+    context = {
+        'comments': comments_page(post_id, request.GET.get('cursor')),
+        'post_id': post_id
+    }
+    return render(request, 'includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -105,9 +163,10 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)\
-        .select_related('author', 'group')
-    page_obj = paginator(request, posts)
+    page_obj = paginator(
+        request, follow_entries(request.user), ordering=FOLLOW_ORDERING
+    )
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {'page_obj': page_obj}
     return render(request, 'posts/follow.html', context)
 
@@ -115,13 +174,44 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if author != request.user:
-        Follow.objects.get_or_create(user=request.user, author=author)
+    follows.follow(request.user, author)
     return redirect('posts:profile', author)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    follows.unfollow(request.user, author)
     return redirect('posts:profile', author)
+
+
+def follow_list(request, username, title, relations, field):
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
+    page_obj = CursorPaginator(
+        relations(author), settings.PAGE_SIZE, follows.ORDERING
+    ).get_page(request.GET.get('cursor'))
+    page_obj.object_list = [getattr(entry, field) for entry in page_obj]
+    context = {
+        'author': author,
+        'title': title,
+        'page_obj': page_obj,
+        'following_ids': follows.following_ids(
+            request.user, [user.id for user in page_obj]
+        ),
+    }
+    return render(request, 'posts/follow_list.html', context)
+
+
+def followers(request, username):
+    return follow_list(
+        request, username, 'Подписчики', follows.followers, 'user'
+    )
+
+
+def following(request, username):
+    return follow_list(
+        request, username, 'Подписки', follows.following, 'author'
+    )
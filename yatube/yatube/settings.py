@@ -10,6 +10,22 @@ DEBUG = True
 
 PAGE_SIZE = 10
 
+PAGINATION_ON_EACH_SIDE = 2
+
+PAGINATION_ON_ENDS = 1
+
+PAGINATION = {
+    'posts:home': 'offset',
+    'posts:groups': 'offset',
+    'posts:profile': 'offset',
+    'posts:follow_index': 'offset',
+    'posts:search': 'offset',
+}
+
+FEED_BATCH_SIZE = 500
+
+COMMENTS_PAGE_SIZE = 20
+
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -34,11 +50,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,7 +86,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+    }
+}
+
+DATABASE_REPLICAS = []
+
+for number, path in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+DATABASE_REPLICA_APPS = ['posts']
+
+DATABASE_PIN_SECONDS = 10
+
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', '1') == '1'
+
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),
 }
 
 
@@ -114,10 +161,76 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+MEDIA_SENDFILE = None
+
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+USER_CACHE_TIMEOUT = 5 * 60
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+FEED_CACHE_LOCK_TIMEOUT = 5
+
+FEED_CACHE_POLL_INTERVAL = 0.05
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024
+
+POST_IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 50 * 1000 * 1000
+
+POST_IMAGE_MAX_SIDE = 1920
+
+POST_IMAGE_FORMAT = 'JPEG'
+
+POST_IMAGE_ALPHA_FORMAT = 'WEBP'
+
+POST_THUMBNAIL_GEOMETRY = '960x339'
+
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+POST_THUMBNAIL_WIDTHS = (320, 640)
+
+POST_IMAGE_SIZES = '(max-width: 992px) 100vw, 960px'
+
+POST_IMAGE_PLACEHOLDER_WIDTH = 16
+
+THUMBNAIL_ASYNC = True
+
+THUMBNAIL_WORKERS = 2
+
+SEARCH_BACKEND = 'auto'
+
+METRICS_ENABLED = True
+
+METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+QUERY_BUDGETS = {
+    'posts:home': 5,
+    'posts:groups': 6,
+    'posts:profile': 7,
+    'posts:post_detail': 5,
+    'posts:comments': 3,
+    'posts:search': 4,
+    'posts:post_create': 3,
+    'posts:post_edit': 5,
+    'posts:follow_index': 4,
+    'posts:followers': 5,
+    'posts:following': 5,
+}
+
+QUERY_BUDGET_STRICT = False
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
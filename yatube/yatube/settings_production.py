@@ -0,0 +1,100 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+CACHE_BACKENDS = {
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'file': 'django.contrib.sessions.backends.file',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+MEDIA_SENDFILE_MODES = {
+    'none': None,
+    'x-sendfile': 'x-sendfile',
+    'x-accel-redirect': 'x-accel-redirect',
+}
+
+
+def env_list(name, default=''):
+    return [item for item in os.getenv(name, default).split(',') if item]
+
+
+def env_choice(name, choices, default):
+    value = os.getenv(name, default)
+    if value not in choices:
+        raise ImproperlyConfigured(
+            f'{name} должен быть одним из: {", ".join(sorted(choices))}'
+        )
+    return choices[value]
+
+
+DEBUG = os.getenv('DJANGO_DEBUG', '0') == '1'
+
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Не задана переменная DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS')
+
+DATABASES = dict(DATABASES)
+DATABASES['default'] = dict(
+    DATABASES['default'],
+    NAME=os.getenv('DB_NAME', DATABASES['default']['NAME']),
+)
+
+# Feed versions and render locks must be shared between worker processes
+# and rely on atomic add/incr, so the file and locmem caches are rejected.
+CACHES = {
+    'default': {
+        'BACKEND': env_choice('CACHE_BACKEND', CACHE_BACKENDS, 'redis'),
+        'LOCATION': env_list('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'yatube'),
+        'VERSION': int(os.getenv('CACHE_VERSION', 1)),
+    }
+}
+if len(CACHES['default']['LOCATION']) == 1:
+    CACHES['default']['LOCATION'] = CACHES['default']['LOCATION'][0]
+
+SESSION_ENGINE = env_choice('SESSION_ENGINE', SESSION_ENGINES, 'cached_db')
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if os.getenv('TEMPLATE_CACHE', '1') == '1':
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)
+    ]
+
+TEMPLATES = [
+    dict(
+        TEMPLATES[0],
+        APP_DIRS=False,
+        OPTIONS=dict(TEMPLATES[0]['OPTIONS'], loaders=TEMPLATE_LOADERS),
+    )
+]
+
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# 'none' streams every file through a Python worker and is only meant for
+# running without a front server; production must offload to nginx/Apache.
+MEDIA_SENDFILE = env_choice(
+    'MEDIA_SENDFILE', MEDIA_SENDFILE_MODES, 'x-accel-redirect'
+)
+
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv(
+    'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/'
+)
+
+METRICS_ALLOWED_IPS = env_list('METRICS_ALLOWED_IPS')
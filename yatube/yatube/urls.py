@@ -1,20 +1,26 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.media import serve as media
+from core.views import metrics
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
 
 urlpatterns = [
     path('', include('posts.urls')),
+    path('api/v1/', include('posts.api_urls')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
-    path('about/', include('about.urls'))
+    path('about/', include('about.urls')),
+    path('metrics', metrics, name='metrics'),
+    re_path(
+        r'^{}(?P<path>.*)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        media,
+        name='media'
+    ),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )